@@ -0,0 +1,80 @@
+import sys
+import os
+import time
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.processor import ImageProcessor
+
+def legacy_auto_detect_gap(mask_img):
+    """Previous implementation: full-frame closing for every gap size, in order."""
+    best_gap = 1
+    min_components = float('inf')
+
+    for gap in [1, 3, 5, 8, 12, 16]:
+        kernel_size = 2 * gap + 1
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
+        closed = cv2.morphologyEx(mask_img, cv2.MORPH_CLOSE, kernel)
+        num_labels, _ = cv2.connectedComponents(closed)
+        components = num_labels - 1
+
+        if components < min_components:
+            min_components = components
+            best_gap = gap
+        if components == 1:
+            break
+    return best_gap
+
+def create_pattern_mask(width, height, style):
+    """Synthetic mask of a sine curve drawn solid, dashed or dotted."""
+    mask = np.zeros((height, width), dtype=np.uint8)
+    xs = np.arange(int(width * 0.1), int(width * 0.9))
+    ys = (height / 2 + height * 0.3 * np.sin(xs / width * 6)).astype(np.int32)
+
+    if style == 'solid':
+        dash, gap = len(xs), 0
+    elif style == 'dashed':
+        dash, gap = 20, 10
+    else:  # dotted
+        dash, gap = 1, 9
+
+    for i in range(0, len(xs) - dash + 1, dash + gap):
+        if style == 'dotted':
+            cv2.circle(mask, (int(xs[i]), int(ys[i])), 2, 255, -1)
+        else:
+            pts = np.column_stack((xs[i:i + dash], ys[i:i + dash])).reshape(-1, 1, 2)
+            cv2.polylines(mask, [pts], False, 255, 2)
+    return mask
+
+def time_call(func, arg, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(arg)
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+def run_benchmark():
+    print("--- Benchmark: auto_detect_gap ---")
+    processor = ImageProcessor()
+    sizes = [(500, 300), (1920, 1080), (3840, 2160)]
+
+    all_match = True
+    for width, height in sizes:
+        for style in ['solid', 'dashed', 'dotted']:
+            mask = create_pattern_mask(width, height, style)
+            old_gap, old_ms = time_call(legacy_auto_detect_gap, mask)
+            new_gap, new_ms = time_call(processor.auto_detect_gap, mask)
+            match = old_gap == new_gap
+            all_match = all_match and match
+            print(f"{width}x{height} {style:7s} legacy={old_ms:8.2f}ms new={new_ms:8.2f}ms "
+                  f"speedup={old_ms / max(new_ms, 1e-6):5.1f}x gap={new_gap} {'OK' if match else 'MISMATCH'}")
+
+    if all_match:
+        print("PASS: New estimator matches legacy gap on all patterns")
+    else:
+        print("FAIL: Gap mismatch against legacy loop")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,57 @@
+import sys
+import os
+import time
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.thinning import zhang_suen_thinning
+
+def create_thick_curves(width, height, thickness, n_curves=5):
+    """Synthetic mask with several thick sine curves (like a closed_mask after morphology)."""
+    mask = np.zeros((height, width), dtype=np.uint8)
+    xs = np.arange(int(width * 0.05), int(width * 0.95))
+    for k in range(n_curves):
+        base = height * (k + 1) / (n_curves + 1)
+        ys = (base + height * 0.05 * np.sin(xs / width * 12 + k)).astype(np.int32)
+        cv2.polylines(mask, [np.column_stack((xs, ys)).reshape(-1, 1, 2)], False, 255, thickness)
+    return mask
+
+def time_call(func, arg, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(arg)
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+def run_benchmark():
+    print("--- Benchmark: Zhang-Suen thinning (NumPy vs ximgproc) ---")
+    has_ximgproc = hasattr(cv2, 'ximgproc')
+    if not has_ximgproc:
+        print("cv2.ximgproc not available: timing NumPy implementation only")
+
+    all_match = True
+    for width, height in [(500, 300), (1920, 1080), (3840, 2160)]:
+        for thickness in [3, 7, 15]:
+            mask = create_thick_curves(width, height, thickness)
+            np_skel, np_ms = time_call(zhang_suen_thinning, mask)
+            line = f"{width}x{height} thick={thickness:2d} numpy={np_ms:8.2f}ms"
+
+            if has_ximgproc:
+                cv_skel, cv_ms = time_call(cv2.ximgproc.thinning, mask)
+                diff = np.count_nonzero(np_skel != cv_skel)
+                all_match = all_match and diff == 0
+                line += f" ximgproc={cv_ms:8.2f}ms ratio={np_ms / max(cv_ms, 1e-6):4.1f}x diff_px={diff}"
+
+            reduction = np.count_nonzero(mask) / max(1, np.count_nonzero(np_skel))
+            print(line + f" reduction={reduction:5.1f}x")
+
+    if has_ximgproc:
+        if all_match:
+            print("PASS: NumPy thinning output identical to ximgproc")
+        else:
+            print("FAIL: NumPy thinning differs from ximgproc")
+
+if __name__ == "__main__":
+    run_benchmark()
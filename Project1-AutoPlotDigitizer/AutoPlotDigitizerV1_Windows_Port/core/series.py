@@ -1,37 +1,105 @@
 from PySide6.QtGui import QColor
-import csv
+import numpy as np
+
+def _as_points(points, dtype):
+    """Converts a list of (x, y) pairs or an array into an (N, 2) array."""
+    return np.asarray(points, dtype=dtype).reshape(-1, 2)
+
+def _as_segments(segments):
+    """Converts per-point polyline indices into an (N,) array (None stays None)."""
+    return None if segments is None else np.asarray(segments, dtype=np.int32).reshape(-1)
 
 class Series:
+    __slots__ = ('name', 'color', 'line_type', 'gap_fill', 'target_hsv',
+                 '_raw_pixels', '_data_points', '_segments', '_lazy_source')
+
     def __init__(self, name: str, color: QColor = None):
         self.name = name
         self.color = color if color else QColor(255, 0, 0)
-        self.raw_pixels = [] # List of (x, y) tuples
-        self.data_points = [] # List of (x, y) tuples (scaled)
+        self._raw_pixels = np.empty((0, 2), dtype=np.int32) # (N, 2) pixel coordinates
+        self._data_points = np.empty((0, 2), dtype=np.float64) # (N, 2) scaled values
+        self._segments = None # (N,) polyline index of each point when traced, None = plain points
+        self._lazy_source = None # (npz, {field: array name}) until first access
         self.line_type = 'auto' # 'auto', 'manual', 'solid'
         self.gap_fill = 3
+        self.target_hsv = None # (h, s, v) picked target color, None = dark lines
+
+    def _load_lazy(self):
+        if self._lazy_source is not None:
+            npz, arrays = self._lazy_source
+            self._lazy_source = None
+            self._raw_pixels = _as_points(npz[arrays['raw_pixels']], np.int32)
+            self._data_points = _as_points(npz[arrays['data_points']], np.float64)
+            self._segments = _as_segments(npz[arrays['segments']]) if 'segments' in arrays else None
+
+    @property
+    def raw_pixels(self):
+        self._load_lazy()
+        return self._raw_pixels
+
+    @raw_pixels.setter
+    def raw_pixels(self, pixels):
+        self._load_lazy()
+        self._raw_pixels = _as_points(pixels, np.int32)
+
+    @property
+    def data_points(self):
+        self._load_lazy()
+        return self._data_points
+
+    @data_points.setter
+    def data_points(self, data_points):
+        self._load_lazy()
+        self._data_points = _as_points(data_points, np.float64)
+
+    @property
+    def segments(self):
+        self._load_lazy()
+        return self._segments
+
+    @segments.setter
+    def segments(self, segments):
+        self._load_lazy()
+        self._segments = _as_segments(segments)
 
-    def set_data(self, pixels, data_points):
+    def set_data(self, pixels, data_points, segments=None):
+        """segments: polyline index of each point (see ImageProcessor.join_polylines), None if not traced"""
         self.raw_pixels = pixels
         self.data_points = data_points
+        self.segments = segments
 
     def __repr__(self):
         return f"<Series '{self.name}' ({len(self.data_points)} points)>"
 
-    def to_dict(self):
-        return {
+    def to_dict(self, include_points=True):
+        data = {
             'name': self.name,
             'color': self.color.name(),
-            'raw_pixels': self.raw_pixels,
-            'data_points': self.data_points,
             'line_type': self.line_type,
-            'gap_fill': self.gap_fill
+            'gap_fill': self.gap_fill,
+            'target_hsv': list(self.target_hsv) if self.target_hsv else None
         }
+        if include_points:
+            data['raw_pixels'] = self.raw_pixels.tolist()
+            data['data_points'] = self.data_points.tolist()
+            if self.segments is not None:
+                data['segments'] = self.segments.tolist()
+        return data
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, npz=None):
+        """
+        data: dict from to_dict (legacy JSON, or settings only with include_points=False)
+              or a binary project manifest entry.
+        npz: open NpzFile holding the arrays named in data['arrays'] (loaded on first access)
+        """
         series = cls(data['name'], QColor(data['color']))
-        series.raw_pixels = data['raw_pixels']
-        series.data_points = data['data_points']
+        if npz is not None and 'arrays' in data:
+            series._lazy_source = (npz, data['arrays'])
+        else:
+            series.set_data(data.get('raw_pixels', []), data.get('data_points', []), data.get('segments'))
         series.line_type = data.get('line_type', 'auto')
         series.gap_fill = data.get('gap_fill', 3)
+        target_hsv = data.get('target_hsv')
+        series.target_hsv = tuple(target_hsv) if target_hsv else None
         return series
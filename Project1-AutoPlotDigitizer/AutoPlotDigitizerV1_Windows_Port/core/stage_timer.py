@@ -0,0 +1,95 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Timer collecting the stages of the current request/job (None = timing off)
+_active_timer: ContextVar = ContextVar('stage_timer', default=None)
+
+class StageTimer:
+    """
+    Accumulates wall time per named pipeline stage (e.g. 'hsv', 'inrange', 'clustering').
+    A stage entered several times, or by parallel workers, adds up, so the per-stage sum
+    can exceed the elapsed total. Thread-safe.
+    """
+
+    def __init__(self):
+        self._stages: OrderedDict = OrderedDict()  # stage name -> seconds, in order of first use
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    @contextmanager
+    def activate(self):
+        """Makes this the timer used by stage()/timed() in the current context"""
+        token = _active_timer.set(self)
+        try:
+            yield self
+        finally:
+            _active_timer.reset(token)
+
+    def stop(self) -> None:
+        """Freezes elapsed (stages can still be added)"""
+        if self._end is None:
+            self._end = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds from creation until stop() (or until now if still running)"""
+        return (self._end if self._end is not None else time.perf_counter()) - self._start
+
+    @property
+    def stages(self) -> dict:
+        with self._lock:
+            return dict(self._stages)
+
+    def as_dict(self) -> dict:
+        """JSON-friendly {'total_seconds', 'stages': {name: seconds}}"""
+        return {
+            'total_seconds': round(self.elapsed, 6),
+            'stages': {name: round(seconds, 6) for name, seconds in self.stages.items()}
+        }
+
+    def summary(self) -> str:
+        """One-line log form, e.g. 'total=41.2ms hsv=8.1ms inrange=3.0ms'"""
+        parts = [f"total={self.elapsed * 1000:.1f}ms"]
+        parts += [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.stages.items()]
+        return ' '.join(parts)
+
+def active_timer() -> Optional[StageTimer]:
+    return _active_timer.get()
+
+@contextmanager
+def stage(name: str):
+    """Times the block into the active StageTimer; does nothing when none is active"""
+    timer = _active_timer.get()
+    if timer is None:
+        yield
+    else:
+        with timer.stage(name):
+            yield
+
+def timed(name: str):
+    """Decorator form of stage(): times every call of the function as stage `name`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
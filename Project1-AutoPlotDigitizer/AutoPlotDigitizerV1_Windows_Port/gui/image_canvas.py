@@ -1,10 +1,39 @@
-from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QGraphicsEllipseItem, QGraphicsPathItem
-from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QImage, QPainterPath
-from PySide6.QtCore import Qt, QPointF, Signal
+from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QGraphicsEllipseItem, QGraphicsPathItem, QGraphicsItem
+from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QImage, QImageReader, QPainterPath, QPolygonF
+from PySide6.QtCore import Qt, QPointF, QRectF, Signal
+import numpy as np
+
+from gui.tiled_image import TiledImageItem, TILED_MIN_PIXELS
+
+class SeriesPointsItem(QGraphicsItem):
+    """Draws all points of one series as a single item (one drawPoints call per paint)"""
+    
+    def __init__(self, points, color, radius=2):
+        super().__init__()
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.point_count = len(pts)
+        self._polygon = QPolygonF([QPointF(x, y) for x, y in pts.tolist()])
+        # Round-capped pen: every point is painted as a dot of the marker size
+        self._pen = QPen(QColor(color), radius * 2 + 2, Qt.SolidLine, Qt.RoundCap)
+        
+        if len(pts):
+            margin = radius + 1
+            (x_min, y_min), (x_max, y_max) = pts.min(axis=0), pts.max(axis=0)
+            self._rect = QRectF(x_min - margin, y_min - margin, x_max - x_min + 2 * margin, y_max - y_min + 2 * margin)
+        else:
+            self._rect = QRectF()
+    
+    def boundingRect(self):
+        return self._rect
+    
+    def paint(self, painter, option, widget=None):
+        painter.setPen(self._pen)
+        painter.drawPoints(self._polygon)
 
 class ImageCanvas(QGraphicsView):
     # Signals to notify MainWindow
     calibration_point_added = Signal(int, float, float) # index, x, y
+    image_load_failed = Signal(str) # error message (background loading of large images)
     
     MODE_VIEW = 0
     MODE_CALIBRATE = 1
@@ -51,13 +80,22 @@ class ImageCanvas(QGraphicsView):
             self.setCursor(Qt.ArrowCursor) 
 
     def load_image(self, file_path):
-        self.current_image = QPixmap(file_path)
         self.scene.clear()
         self.calibration_points = []
         self.mask_items = []
         self.extracted_point_items = []
-        
-        self.image_item = self.scene.addPixmap(self.current_image)
+
+        size = QImageReader(file_path).size() # Header only, no decode
+        if size.width() * size.height() > TILED_MIN_PIXELS:
+            # Large scan: pyramid is built in the background, only visible tiles are painted
+            self.current_image = None
+            self.image_item = TiledImageItem(file_path, size)
+            self.image_item.load_failed.connect(self.image_load_failed)
+            self.scene.addItem(self.image_item)
+            self.image_item.start_loading()
+        else:
+            self.current_image = QPixmap(file_path)
+            self.image_item = self.scene.addPixmap(self.current_image)
         self.image_item.setZValue(0)
         self.setSceneRect(self.image_item.boundingRect())
         self.fitInView(self.image_item, Qt.KeepAspectRatio)
@@ -156,15 +194,44 @@ class ImageCanvas(QGraphicsView):
         if self.image_item is None:
             return None
             
+        rect = self.image_item.boundingRect()
+        image = QImage(int(rect.width()), int(rect.height()), QImage.Format_Grayscale8)
+        image.fill(Qt.black)
+        self._paint_mask(image)
+        return image
+
+    def get_mask_array(self):
+        """
+        Renders the mask items straight into an (H, W) uint8 NumPy array matching the original image size.
+        The QImage painted on is a view over the array's memory, so no buffer copies are made.
+        """
+        if self.image_item is None:
+            return None
+            
         rect = self.image_item.boundingRect()
         width = int(rect.width())
         height = int(rect.height())
         
-        image = QImage(width, height, QImage.Format_Grayscale8)
-        image.fill(Qt.black)
-        
+        mask = np.zeros((height, width), dtype=np.uint8)
+        image = QImage(mask.data, width, height, width, QImage.Format_Grayscale8)
+        self._paint_mask(image)
+        return mask
+
+    def mask_bounding_rect(self):
+        """Bounding rectangle of all mask strokes (including pen width), in image pixels."""
+        rect = QRectF()
+        for item in self.mask_items:
+            rect = rect.united(item.path().boundingRect())
+        if rect.isNull():
+            return rect
+        margin = self.pen_size / 2 + 1
+        return rect.adjusted(-margin, -margin, margin, margin)
+
+    def _paint_mask(self, image):
+        """Paints the mask strokes in white onto a black Grayscale8 image, rasterizing only their bounding rect."""
         painter = QPainter(image)
         painter.setRenderHint(QPainter.Antialiasing)
+        painter.setClipRect(self.mask_bounding_rect().intersected(QRectF(image.rect())))
         
         # Simple approach: Draw the paths directly
         pen = QPen(Qt.white, self.pen_size, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
@@ -175,7 +242,6 @@ class ImageCanvas(QGraphicsView):
             painter.drawPath(item.path())
             
         painter.end()
-        return image
 
     def clear_mask(self):
         """Clears all drawn mask items from the scene."""
@@ -188,14 +254,19 @@ class ImageCanvas(QGraphicsView):
             self.current_path_item = None
 
     def draw_extracted_points(self, points, color=Qt.green):
-        """Draws extracted points (pixels) on the scene."""
-        pen = QPen(color, 2)
-        radius = 2
-        
-        for x, y in points:
-            item = self.scene.addEllipse(x-radius, y-radius, radius*2, radius*2, pen, color)
-            item.setZValue(8) # Below calibration (10) but above mask (5)
-            self.extracted_point_items.append(item)
+        """Draws extracted points (pixels) on the scene as one batched item and returns it."""
+        item = SeriesPointsItem(points, color)
+        item.setZValue(8) # Below calibration (10) but above mask (5)
+        self.scene.addItem(item)
+        self.extracted_point_items.append(item)
+        return item
+
+    def remove_extracted_points(self, item):
+        """Removes one series item previously returned by draw_extracted_points."""
+        if item in self.extracted_point_items:
+            self.extracted_point_items.remove(item)
+            if item.scene() == self.scene:
+                self.scene.removeItem(item)
 
     def clear_extracted_points(self):
         """Clears all extracted point items from the scene."""
@@ -1,16 +1,17 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QPushButton, QFileDialog, QGroupBox, QLineEdit, QFormLayout,
                                QRadioButton, QButtonGroup, QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox,
-                               QColorDialog, QComboBox, QSlider, QCheckBox)
-from PySide6.QtCore import Qt, Slot
+                               QColorDialog, QComboBox, QSlider, QCheckBox, QProgressBar)
+from PySide6.QtCore import Qt, Slot, QThreadPool
 from PySide6.QtGui import QImage, QColor
 from gui.image_canvas import ImageCanvas
-from core.project import Project
+from core.project import Project, CHANGE_RESET, CHANGE_CALIBRATION, CHANGE_SERIES_ADDED, CHANGE_SERIES_REMOVED
 from core.series import Series
 from core.processor import ImageProcessor
-import cv2
+from gui.extraction_worker import ExtractionJob
+import copy
 import numpy as np
-import csv
+import os
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -20,8 +21,15 @@ class MainWindow(QMainWindow):
         
         # Initialize Core Project Model
         self.project_model = Project()
+        self.series_items = [] # Canvas item per series, same order as project_model.series_list
         self.project_model.add_observer(self.on_project_updated)
         
+        # Extraction runs off the GUI thread; one worker so queued requests run in order
+        self.extraction_pool = QThreadPool(self)
+        self.extraction_pool.setMaxThreadCount(1)
+        self.extraction_jobs = {} # job_id -> (ExtractionJob, series settings), queued or running
+        self.next_job_id = 0
+        
         # Central Widget
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -128,6 +136,15 @@ class MainWindow(QMainWindow):
         mask_layout.addWidget(self.container_gap)
         self.container_gap.setVisible(False)
         
+        # Polyline Tracing (ordered curves instead of raw pixels)
+        self.chk_trace = QCheckBox("Trace Polylines (vertical/looping curves)")
+        self.inp_simplify_tol = QLineEdit("1.0")
+        trace_layout = QHBoxLayout()
+        trace_layout.addWidget(QLabel("Simplify Tolerance (px):"))
+        trace_layout.addWidget(self.inp_simplify_tol)
+        mask_layout.addWidget(self.chk_trace)
+        mask_layout.addLayout(trace_layout)
+        
         mask_btn_layout = QHBoxLayout()
         self.btn_undo_mask = QPushButton("Undo Stroke")
         self.btn_undo_mask.clicked.connect(self.undo_mask)
@@ -152,6 +169,16 @@ class MainWindow(QMainWindow):
         extract_layout.addWidget(QLabel("Series Name:"))
         extract_layout.addWidget(self.inp_series_name)
         extract_layout.addWidget(self.btn_extract)
+        
+        self.progress_extract = QProgressBar()
+        self.progress_extract.setRange(0, 100)
+        self.lbl_extract_status = QLabel("Idle")
+        self.btn_cancel_extract = QPushButton("Cancel Extraction")
+        self.btn_cancel_extract.clicked.connect(self.cancel_extraction)
+        self.btn_cancel_extract.setEnabled(False)
+        extract_layout.addWidget(self.progress_extract)
+        extract_layout.addWidget(self.lbl_extract_status)
+        extract_layout.addWidget(self.btn_cancel_extract)
         gb_extract.setLayout(extract_layout)
         
         # 5. Series List & Export
@@ -189,6 +216,7 @@ class MainWindow(QMainWindow):
         # Center (Canvas)
         self.canvas = ImageCanvas()
         self.canvas.calibration_point_added.connect(self.on_calibration_point_added)
+        self.canvas.image_load_failed.connect(self.on_image_load_failed)
         
         # Add to main layout
         main_layout.addWidget(left_panel)
@@ -203,6 +231,7 @@ class MainWindow(QMainWindow):
     def load_image(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Open Image", "", "Images (*.png *.jpg *.jpeg *.bmp)")
         if file_path:
+            self.cancel_extraction() # Queued results belong to the previous image
             self.project_model.set_image(file_path)
             self.canvas.load_image(file_path)
             self.lbl_status.setText(f"Loaded: {file_path.split('/')[-1]}")
@@ -210,6 +239,11 @@ class MainWindow(QMainWindow):
             # Reset UI state (Calibration/Mask modes) 
             self.reset_ui_modes()
 
+    def on_image_load_failed(self, error):
+        # Large images finish decoding in the background, after load_image returned
+        self.lbl_status.setText("Image failed to load")
+        QMessageBox.warning(self, "Error", f"Failed to load image: {error}")
+
     def reset_ui_modes(self):
         self.btn_calib_mode.setText("Set Calibration Points (0/4)")
         self.btn_calib_mode.setChecked(False)
@@ -218,7 +252,9 @@ class MainWindow(QMainWindow):
         self.inp_series_name.setText("Series 1")
 
     # Observer Callback
-    def on_project_updated(self):
+    def on_project_updated(self, change=(CHANGE_RESET, None)):
+        kind, index = change
+        
         # Update Table from Project Model
         self.table.setRowCount(0)
         for i, series in enumerate(self.project_model.series_list):
@@ -276,15 +312,24 @@ class MainWindow(QMainWindow):
              self.canvas.restore_calibration_points(self.project_model.calibration.pixel_points)
              self.btn_calib_mode.setText("Set Calibration Points (4/4)") # Update text
         
-        # 3. Draw Series
-        self.canvas.clear_extracted_points()
-        
-        # Actually draw:
-        for series in self.project_model.series_list:
-             self.canvas.draw_extracted_points(series.raw_pixels, color=series.color)
-        
-        # Update next series name
-        next_idx = len(self.project_model.series_list) + 1
+        # 3. Draw Series (one batched item per series, only the changed one is redrawn)
+        if kind == CHANGE_SERIES_ADDED:
+            series = self.project_model.series_list[index]
+            self.series_items.insert(index, self.canvas.draw_extracted_points(series.raw_pixels, color=series.color))
+        elif kind == CHANGE_SERIES_REMOVED:
+            self.canvas.remove_extracted_points(self.series_items.pop(index))
+        elif kind != CHANGE_CALIBRATION:
+            self.canvas.clear_extracted_points()
+            self.series_items = [
+                self.canvas.draw_extracted_points(series.raw_pixels, color=series.color)
+                for series in self.project_model.series_list
+            ]
+        
+        self.update_next_series_name()
+
+    def update_next_series_name(self):
+        # Queued extractions already own the next names
+        next_idx = len(self.project_model.series_list) + len(self.extraction_jobs) + 1
         self.inp_series_name.setText(f"Series {next_idx}")
 
     def toggle_calibration_mode(self):
@@ -393,35 +438,14 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", f"Calibration failed: {str(e)}")
             return
 
-        # Get Mask
-        try:
-            mask_qimage = self.canvas.get_mask_image()
-            if mask_qimage is None:
-                 QMessageBox.warning(self, "Error", "Failed to get mask.")
-                 return
-            
-            ptr = mask_qimage.constBits()
-            width = mask_qimage.width()
-            height = mask_qimage.height()
-            bytes_per_line = mask_qimage.bytesPerLine()
-
-            raw_arr = np.array(ptr, copy=True).reshape(height, bytes_per_line)
-            mask_arr = raw_arr[:, :width].copy() 
-            
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Mask Error: {e}")
+        # Get Mask (rendered directly into a NumPy array)
+        mask_arr = self.canvas.get_mask_array()
+        if mask_arr is None:
+            QMessageBox.warning(self, "Error", "Failed to get mask.")
             return
         
-        # Processing
-        original_cv_img = cv2.imread(self.project_model.image_path)
-        processor = ImageProcessor()
-        
-        hsv_range = None
-        if self.target_color_hsv:
-            h, s, v = self.target_color_hsv
-            lower = np.array([max(0, h-10), max(0, s-50), max(0, v-50)])
-            upper = np.array([min(180, h+10), min(255, s+50), min(255, v+50)])
-            hsv_range = (lower, upper)
+        # Processing (queued on the extraction worker)
+        hsv_range = ImageProcessor.hsv_range_from_target(self.target_color_hsv)
         
         try:
             mode_text = self.combo_pattern.currentText()
@@ -434,75 +458,142 @@ class MainWindow(QMainWindow):
                 line_type = 'manual'
                 gap_fill = self.slider_gap.value()
             
-            points_px, _ = processor.process_images(original_cv_img, mask_arr, hsv_range=hsv_range, line_type=line_type, gap_fill=gap_fill)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Processing failed: {str(e)}")
+            trace = self.chk_trace.isChecked()
+            simplify_tolerance = float(self.inp_simplify_tol.text()) if trace else None
+        except ValueError:
+            QMessageBox.warning(self, "Error", "Invalid simplify tolerance.")
             return
-            
-        # Map & Add to Project
-        series_points = []
-        for px, py in points_px:
-            dx, dy = self.project_model.calibration.map_to_data(px, py)
-            series_points.append((dx, dy))
-            
-        series_name = self.inp_series_name.text()
-        vis_color = self.current_series_color if self.target_color_hsv else QColor(np.random.randint(0, 255), np.random.randint(0, 255), np.random.randint(0, 255))
         
-        new_series = Series(series_name, vis_color)
-        new_series.set_data(points_px, series_points)
-        new_series.line_type = line_type
-        if gap_fill: new_series.gap_fill = gap_fill
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        job = ExtractionJob(job_id, self.project_model.image_path, mask_arr, copy.deepcopy(self.project_model.calibration),
+                            hsv_range=hsv_range, line_type=line_type, gap_fill=gap_fill,
+                            trace=trace, simplify_tolerance=simplify_tolerance, image_cache=self.project_model.image_cache)
+        job.signals.progress.connect(self.on_extraction_progress)
+        job.signals.finished.connect(self.on_extraction_finished)
+        job.signals.failed.connect(self.on_extraction_failed)
+        job.signals.cancelled.connect(self.on_extraction_cancelled)
+        
+        # Series settings are captured now: the UI may change before the job runs
+        settings = {
+            'name': self.inp_series_name.text(),
+            'color': self.current_series_color if self.target_color_hsv else QColor(np.random.randint(0, 255), np.random.randint(0, 255), np.random.randint(0, 255)),
+            'line_type': line_type,
+            'gap_fill': gap_fill,
+            'target_hsv': self.target_color_hsv
+        }
+        self.extraction_jobs[job_id] = (job, settings)
+        self.extraction_pool.start(job)
+        self.update_next_series_name()
+        self.update_extraction_status(f"Queued '{settings['name']}'")
+        
+    def update_extraction_status(self, text):
+        queued = len(self.extraction_jobs)
+        self.lbl_extract_status.setText(f"{text} ({queued} pending)" if queued > 1 else text)
+        self.btn_cancel_extract.setEnabled(queued > 0)
+        
+    def cancel_extraction(self):
+        """Cancels the running extraction and everything queued behind it."""
+        for job, _ in self.extraction_jobs.values():
+            job.cancel()
+        
+    @Slot(int, str, int)
+    def on_extraction_progress(self, job_id, stage, percent):
+        if job_id not in self.extraction_jobs:
+            return
+        name = self.extraction_jobs[job_id][1]['name']
+        self.progress_extract.setValue(percent)
+        self.update_extraction_status(f"'{name}': {stage}")
+        
+    @Slot(int, object, object, object)
+    def on_extraction_finished(self, job_id, points_px, series_points, segments):
+        job, settings = self.extraction_jobs[job_id]
+        if job.is_cancelled:
+            # Cancelled after its last stage started (e.g. a new image was loaded meanwhile)
+            self.on_extraction_cancelled(job_id)
+            return
+        del self.extraction_jobs[job_id]
+        
+        # Back on the GUI thread: safe to update the Project (and the canvas via observers)
+        new_series = Series(settings['name'], settings['color'])
+        new_series.set_data(points_px, series_points, segments)
+        new_series.line_type = settings['line_type']
+        if settings['gap_fill']: new_series.gap_fill = settings['gap_fill']
+        new_series.target_hsv = settings['target_hsv']
         
         self.project_model.add_series(new_series)
-        QMessageBox.information(self, "Success", f"Added Series '{series_name}' with {len(series_points)} points.")
+        self.progress_extract.setValue(100)
+        self.update_extraction_status(f"Added Series '{new_series.name}' with {len(series_points)} points "
+                                      f"in {job.timer.elapsed:.2f}s.")
+        # Where the time went, per stage (load, hsv, inrange, morphology, skeleton, mapping, ...)
+        self.lbl_extract_status.setToolTip(job.timer.summary())
+        
+    @Slot(int, str)
+    def on_extraction_failed(self, job_id, error):
+        _, settings = self.extraction_jobs.pop(job_id)
+        self.progress_extract.setValue(0)
+        self.update_extraction_status(f"'{settings['name']}' failed")
+        QMessageBox.warning(self, "Error", f"Processing failed: {error}")
+        
+    @Slot(int)
+    def on_extraction_cancelled(self, job_id):
+        _, settings = self.extraction_jobs.pop(job_id)
+        self.progress_extract.setValue(0)
+        self.update_extraction_status(f"Cancelled '{settings['name']}'")
+        
+    def closeEvent(self, event):
+        self.cancel_extraction()
+        self.extraction_pool.waitForDone()
+        super().closeEvent(event)
         
     def clear_all_series(self):
         self.project_model.clear_data()
-        # Visual clear handled by observer (partially, check logic above)
-        # We need to manually clear items in canvas because we decided observer wouldn't wipe image
-        self.canvas.clear_extracted_points() # Need to implement this
+        # Canvas overlays are cleared by the observer (reset)
 
     def delete_selected_series(self):
         row = self.table.currentRow()
         if row < 0:
             QMessageBox.warning(self, "Error", "Please select a series to delete.")
             return
+        # Observer removes just this series' canvas item
         self.project_model.remove_series(row)
-        self.canvas.clear_extracted_points() # Implement this!
-        self.on_project_updated() # Re-draw remaining
 
     def export_csv(self):
         if not self.project_model.series_list:
             return
             
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save CSV", "", "CSV Files (*.csv)")
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save CSV", "", "CSV Files (*.csv);;CSV Long Format (*.csv);;Parquet Files (*.parquet)")
         if file_path:
             try:
-                header, rows = self.project_model.get_csv_data()
-                with open(file_path, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(header)
-                    writer.writerows(rows)
+                layout = 'long' if "Long" in selected_filter else 'wide'
+                if "Parquet" in selected_filter or file_path.lower().endswith('.parquet'):
+                    self.project_model.write_parquet(file_path)
+                else:
+                    self.project_model.write_csv(file_path, layout=layout)
                 QMessageBox.information(self, "Saved", f"Data saved to {file_path}")
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Failed to save: {str(e)}")
 
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to save: {str(e)}")
-
     def save_project_ui(self):
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save Project", "", "JSON Files (*.json)")
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Project", "", "Binary Project (*.npz);;JSON Files (*.json)")
         if file_path:
             try:
+                # Keep the drawn mask next to the project so it can serve as a batch template
+                if self.canvas.mask_items:
+                    mask_path = os.path.splitext(file_path)[0] + "_mask.png"
+                    self.canvas.get_mask_image().save(mask_path)
+                    self.project_model.mask_path = mask_path
                 self.project_model.save_project(file_path)
                 QMessageBox.information(self, "Success", f"Project saved to {file_path}")
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Failed to save project: {str(e)}")
 
     def load_project_ui(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open Project", "", "JSON Files (*.json)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Project", "", "Project Files (*.npz *.json)")
         if file_path:
             try:
+                self.cancel_extraction()
                 # Load logic:
                 # 1. Load data
                 self.project_model.load_project(file_path)
@@ -511,7 +602,8 @@ class MainWindow(QMainWindow):
                 if self.project_model.image_path:
                      self.canvas.load_image(self.project_model.image_path)
                      self.lbl_status.setText(f"Loaded Project: {self.project_model.image_path.split('/')[-1]}")
-                     # on_project_updated will trigger and restore points
+                     # Loading the image cleared the scene: restore points and series overlays
+                     self.on_project_updated()
                 
                 QMessageBox.information(self, "Success", f"Project loaded from {file_path}")
             except Exception as e:
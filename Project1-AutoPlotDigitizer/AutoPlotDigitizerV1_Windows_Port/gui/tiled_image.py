@@ -0,0 +1,253 @@
+import math
+from collections import OrderedDict
+
+from PySide6.QtWidgets import QGraphicsObject, QGraphicsItem, QStyleOptionGraphicsItem
+from PySide6.QtGui import QImage, QImageReader, QPixmap, QPainter
+from PySide6.QtCore import Qt, QObject, QRect, QRectF, QRunnable, QSize, QThreadPool, Signal
+
+TILE_SIZE = 512
+TILED_MIN_PIXELS = 4096 * 4096 # Smaller images keep a plain QGraphicsPixmapItem
+MAX_CACHED_TILES = 128 # ~128 MB of tile pixmaps at 512x512 RGB32
+
+class PyramidSignals(QObject):
+    level_ready = Signal(int, object) # level, QImage
+    tile_ready = Signal(int, int, object) # tx, ty, full-resolution QImage tile
+    failed = Signal(str)
+    done = Signal() # FullResTileLoader finished (tiles sent or failed)
+
+def _open_reader(file_path):
+    reader = QImageReader(file_path)
+    reader.setAllocationLimit(0) # Large scans exceed Qt's default 256 MB limit
+    return reader
+
+class PyramidBuilder(QRunnable):
+    """
+    Background job: decodes the image at half resolution (level 1) and halves it until
+    it fits in a single tile. Each level is emitted as soon as it exists. The full
+    resolution image is never kept; its tiles are read on demand by FullResTileLoader.
+    Formats that can decode scaled (JPEG) never hold the full image at all.
+    """
+    def __init__(self, file_path, size):
+        super().__init__()
+        self.file_path = file_path
+        self.size = size
+        self.signals = PyramidSignals()
+
+    def run(self):
+        reader = _open_reader(self.file_path)
+        reader.setScaledSize(QSize(max(1, self.size.width() // 2), max(1, self.size.height() // 2)))
+        image = reader.read()
+        if image.isNull():
+            self.signals.failed.emit(reader.errorString())
+            return
+
+        image = image.convertToFormat(QImage.Format_RGB32)
+        level = 1
+        self.signals.level_ready.emit(level, image)
+        while max(image.width(), image.height()) > TILE_SIZE:
+            image = image.scaled(max(1, image.width() // 2), max(1, image.height() // 2),
+                                 Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            level += 1
+            self.signals.level_ready.emit(level, image)
+
+class FullResTileLoader(QRunnable):
+    """
+    Background job: reads a batch of full-resolution tiles with a single decode of
+    their bounding rectangle. Formats with clip rect support (JPEG) decode just that
+    rectangle; for others (PNG, BMP, ...) Qt decodes the whole image and crops it,
+    which is why TiledImageItem runs one loader at a time. Nothing larger than the
+    tiles outlives the job.
+    """
+    def __init__(self, file_path, size, tiles):
+        super().__init__()
+        self.file_path = file_path
+        self.size = size
+        self.tiles = tiles # [(tx, ty)]
+        self.signals = PyramidSignals()
+
+    def run(self):
+        try:
+            self._load()
+        finally:
+            self.signals.done.emit()
+
+    def _load(self):
+        rects = {}
+        for tx, ty in self.tiles:
+            x, y = tx * TILE_SIZE, ty * TILE_SIZE
+            rects[(tx, ty)] = QRect(x, y, min(TILE_SIZE, self.size.width() - x), min(TILE_SIZE, self.size.height() - y))
+        bounds = QRect()
+        for rect in rects.values():
+            bounds = bounds.united(rect)
+
+        reader = _open_reader(self.file_path)
+        reader.setClipRect(bounds)
+        region = reader.read()
+        if region.isNull():
+            self.signals.failed.emit(reader.errorString())
+            return
+        region = region.convertToFormat(QImage.Format_RGB32)
+        for (tx, ty), rect in rects.items():
+            self.signals.tile_ready.emit(tx, ty, region.copy(rect.translated(-bounds.topLeft())))
+
+class TiledImageItem(QGraphicsObject):
+    """
+    Image item for large scans. Item coordinates are always full-resolution pixels,
+    but only the tiles visible in the exposed rect are painted, taken from the
+    pyramid level matching the current zoom. Levels 1+ are kept in memory (a third
+    of the full image); full-resolution tiles are loaded in the background when
+    zoomed in, one loader at a time, with the level 1 image shown until they arrive.
+    Tile pixmaps are kept in a small LRU cache.
+    """
+    load_failed = Signal(str)
+
+    def __init__(self, file_path, size):
+        super().__init__()
+        self.file_path = file_path
+        self._size = size
+        self._rect = QRectF(0, 0, size.width(), size.height())
+        self._levels = {} # level (1+) -> QImage
+        self._tiles = OrderedDict() # (level, tx, ty) -> QPixmap
+        self._pending = set() # Full-resolution tiles being loaded
+        self._loader_busy = False # A FullResTileLoader is running for this item
+        self._tiles_wanted = False # Tiles were requested while it ran: repaint when it is done
+        self._full_res_failed = False
+        self._pool = None
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption) # Needed for exposedRect
+
+    def start_loading(self, pool=None):
+        self._pool = pool or QThreadPool.globalInstance()
+        builder = PyramidBuilder(self.file_path, self._size)
+        # Queued to the GUI thread; dropped automatically if this item is deleted first
+        builder.signals.level_ready.connect(self._on_level_ready)
+        builder.signals.failed.connect(self._on_failed)
+        self._pool.start(builder)
+        return builder
+
+    def _on_level_ready(self, level, image):
+        self._levels[level] = image
+        self.update()
+
+    def _on_failed(self, error):
+        if self._full_res_failed:
+            return # Reported already (several loaders may fail)
+        self._full_res_failed = True # Keep showing the coarser levels
+        self.load_failed.emit(f"Could not load {self.file_path}: {error}")
+
+    def _on_tile_ready(self, tx, ty, image):
+        self._pending.discard((tx, ty))
+        self._cache_tile((0, tx, ty), QPixmap.fromImage(image))
+        self.update(QRectF(tx * TILE_SIZE, ty * TILE_SIZE, image.width(), image.height()))
+
+    def _on_loader_done(self):
+        self._loader_busy = False
+        self._pending.clear()
+        if self._tiles_wanted:
+            self._tiles_wanted = False
+            self.update() # Repaint requests whatever the view is missing now
+
+    @property
+    def is_loaded(self):
+        return bool(self._levels)
+
+    def boundingRect(self):
+        return self._rect
+
+    def _pick_level(self, lod):
+        """Finest available level that is not sharper than needed at this zoom (0 = full resolution)."""
+        wanted = max(0, int(math.floor(math.log2(1.0 / lod)))) if lod > 0 else 0
+        if wanted == 0 and not self._full_res_failed:
+            return 0
+        coarser_or_equal = [lvl for lvl in self._levels if lvl <= wanted]
+        return max(coarser_or_equal) if coarser_or_equal else min(self._levels)
+
+    def _cache_tile(self, key, pixmap):
+        self._tiles[key] = pixmap
+        if len(self._tiles) > MAX_CACHED_TILES:
+            self._tiles.popitem(last=False)
+
+    def _tile(self, level, tx, ty):
+        key = (level, tx, ty)
+        pixmap = self._tiles.get(key)
+        if pixmap is None:
+            image = self._levels[level]
+            x, y = tx * TILE_SIZE, ty * TILE_SIZE
+            pixmap = QPixmap.fromImage(image.copy(x, y, min(TILE_SIZE, image.width() - x), min(TILE_SIZE, image.height() - y)))
+            self._cache_tile(key, pixmap)
+        else:
+            self._tiles.move_to_end(key)
+        return pixmap
+
+    @staticmethod
+    def _tile_range(exposed, sx, sy, width, height):
+        """Tiles (of a level width x height, scaled by sx, sy to item pixels) covering exposed"""
+        tx0 = int(exposed.left() / sx) // TILE_SIZE
+        ty0 = int(exposed.top() / sy) // TILE_SIZE
+        tx1 = min(int(math.ceil(exposed.right() / sx)), width - 1) // TILE_SIZE
+        ty1 = min(int(math.ceil(exposed.bottom() / sy)), height - 1) // TILE_SIZE
+        return [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+
+    def _paint_level(self, painter, exposed, level):
+        image = self._levels[level]
+        # Level pixel -> item (full-resolution) pixel
+        sx = self._rect.width() / image.width()
+        sy = self._rect.height() / image.height()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+        for tx, ty in self._tile_range(exposed, sx, sy, image.width(), image.height()):
+            pixmap = self._tile(level, tx, ty)
+            target = QRectF(tx * TILE_SIZE * sx, ty * TILE_SIZE * sy, pixmap.width() * sx, pixmap.height() * sy)
+            painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+
+    def _paint_full_resolution(self, painter, exposed):
+        width, height = self._size.width(), self._size.height()
+        tiles = self._tile_range(exposed, 1.0, 1.0, width, height)
+        missing = [t for t in tiles if (0,) + t not in self._tiles]
+        if missing:
+            # Coarse placeholder until the tiles arrive; also fetch a ring of neighbours for panning
+            self._paint_level(painter, exposed, min(self._levels))
+            ring = self._tile_range(exposed.adjusted(-TILE_SIZE, -TILE_SIZE, TILE_SIZE, TILE_SIZE).intersected(self._rect),
+                                    1.0, 1.0, width, height)
+            self._request_tiles([t for t in ring if (0,) + t not in self._tiles])
+
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        for tx, ty in tiles:
+            pixmap = self._tiles.get((0, tx, ty))
+            if pixmap is not None:
+                self._tiles.move_to_end((0, tx, ty))
+                painter.drawPixmap(tx * TILE_SIZE, ty * TILE_SIZE, pixmap)
+
+    def _request_tiles(self, tiles):
+        tiles = [t for t in tiles if t not in self._pending]
+        if not tiles:
+            return
+        if self._loader_busy:
+            # Formats without clip rect support decode the whole image per loader:
+            # never run two at once, ask again for the then-visible tiles when it ends
+            self._tiles_wanted = True
+            return
+        self._loader_busy = True
+        self._pending.update(tiles)
+        loader = FullResTileLoader(self.file_path, self._size, tiles)
+        loader.signals.tile_ready.connect(self._on_tile_ready)
+        loader.signals.failed.connect(self._on_failed)
+        loader.signals.done.connect(self._on_loader_done)
+        self._pool.start(loader)
+
+    def paint(self, painter, option, widget=None):
+        if not self._levels:
+            return
+
+        # Only what reaches the device: exposedRect can be the whole item (e.g. QGraphicsView.render)
+        visible = painter.worldTransform().inverted()[0].mapRect(QRectF(painter.viewport()))
+        exposed = option.exposedRect.intersected(self._rect).intersected(visible)
+        if exposed.isEmpty():
+            return
+
+        # Antialiased edges would leave hairline seams between tiles
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        level = self._pick_level(lod)
+        if level == 0:
+            self._paint_full_resolution(painter, exposed)
+        else:
+            self._paint_level(painter, exposed, level)
@@ -0,0 +1,70 @@
+import sys
+import os
+import json
+import tempfile
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import batch
+from core.project import Project
+from core.series import Series
+
+def test_csv_names():
+    print("--- Testing Batch CSV Names ---")
+    names = batch.csv_names(["in/a.png", "in/a.jpg", "in/a.png.bmp", "in/B.tif", "in/b.png", "in/c.png"])
+    expected = {
+        "in/a.png": "a.png.csv",
+        "in/a.jpg": "a.jpg.csv",
+        "in/a.png.bmp": "a.png_2.csv",
+        "in/B.tif": "B.tif.csv",
+        "in/b.png": "b.png.csv",
+        "in/c.png": "c.csv",
+    }
+    if names == expected:
+        print("PASS: Images sharing a stem get distinct CSV names")
+    else:
+        print(f"FAIL: {names}")
+
+def test_same_stem_run():
+    print("\n--- Testing Batch Run With Same-Stem Images ---")
+    tmp = tempfile.mkdtemp()
+    input_dir = os.path.join(tmp, "in")
+    output_dir = os.path.join(tmp, "out")
+    os.makedirs(input_dir)
+
+    # Same stem, different curves: each CSV must hold its own image's points
+    for ext, y in (("png", 100), ("jpg", 200)):
+        image = np.full((300, 500, 3), 255, dtype=np.uint8)
+        cv2.line(image, (60, y), (440, y), (0, 0, 0), 2)
+        cv2.imwrite(os.path.join(input_dir, f"a.{ext}"), image)
+
+    template = Project()
+    template.update_calibration([(50, 250), (450, 250), (50, 250), (50, 50)], [(0, 0), (10, 0), (0, 0), (0, 1)])
+    template.add_series(Series("Curve"))
+    template_path = os.path.join(tmp, "template.json")
+    template.save_project(template_path)
+
+    code = batch.main([input_dir, "--template", template_path, "--output", output_dir, "--workers", "2"])
+    with open(os.path.join(output_dir, "manifest.json")) as f:
+        results = json.load(f)['results']
+    csvs = [r['csv'] for r in results]
+
+    def mean_y(path):
+        data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+        return data[:, 1].mean()
+
+    distinct = len(set(csvs)) == 2 and all(os.path.exists(p) for p in csvs)
+    # y = 100 px maps to 0.75, y = 200 px to 0.25
+    own_data = distinct and all(abs(mean_y(r['csv']) - (0.25 if r['image'].endswith(".jpg") else 0.75)) < 0.02
+                                for r in results)
+    if code == 0 and distinct and own_data:
+        print("PASS: Each image writes its own CSV")
+    else:
+        print(f"FAIL: exit={code}, csvs={csvs}, own data={own_data}")
+
+if __name__ == "__main__":
+    test_csv_names()
+    test_same_stem_run()
@@ -1,6 +1,8 @@
 import sys
 import os
 import cv2
+import time
+import tempfile
 import numpy as np
 
 # Add parent directory to path
@@ -8,8 +10,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.processor import ImageProcessor
 from core.calibration import Calibrator
-from core.project import Project
+from core.project import Project, CHANGE_RESET, CHANGE_CALIBRATION, CHANGE_SERIES_ADDED, CHANGE_SERIES_REMOVED
 from core.series import Series
+from core.thinning import zhang_suen_thinning
+from core.image_cache import ImageCache
+from core.stage_timer import StageTimer
 
 def create_synthetic_plot():
     width, height = 500, 300
@@ -48,7 +53,7 @@ def test_extraction_and_model():
     image = create_synthetic_plot()
     mask = create_mask(500, 300)
     
-    cv2.imwrite("test_plot_v2.png", image)
+    cv2.imwrite(os.path.join(tempfile.mkdtemp(), "test_plot_v2.png"), image)
     
     # 1. Processing
     processor = ImageProcessor()
@@ -68,10 +73,7 @@ def test_extraction_and_model():
     
     # Map Data
     series = Series("SineWave")
-    data_points = []
-    for px, py in points:
-        dx, dy = project.calibration.map_to_data(px, py)
-        data_points.append((dx, dy))
+    data_points = project.map_pixels(points).tolist()
     series.set_data(points, data_points)
     project.add_series(series)
     
@@ -115,6 +117,216 @@ def test_log_calibration():
     else:
         print(f"FAIL: Expected 10.0, got {dx}")
 
+def test_batch_mapping():
+    print("\n--- Testing Batch Mapping (map_to_data_many) ---")
+    pixels = np.array([(x, y) for x in range(50, 451, 25) for y in range(50, 451, 40)], dtype=np.float64)
+    
+    cases = []
+    
+    linear = Calibrator()
+    linear.set_calibration([(50, 250), (450, 250), (50, 250), (50, 50)], [(0, 0), (10, 0), (0, 0), (0, 1)])
+    cases.append(("Linear", linear))
+    
+    log_xy = Calibrator()
+    log_xy.set_calibration([(100, 200), (300, 200), (100, 200), (100, 100)], [(1, 0), (100, 0), (1, 1), (1, 1000)], is_log_x=True, is_log_y=True)
+    cases.append(("Log X/Y", log_xy))
+    
+    persp = Calibrator()
+    persp.set_perspective_calibration([(50, 50), (450, 50), (400, 450), (100, 450)], [(1, 10), (10, 10), (10, 1), (1, 1)], is_log_x=True)
+    cases.append(("Perspective + Log X", persp))
+    
+    for name, calib in cases:
+        batch = calib.map_to_data_many(pixels)
+        scalar = np.array([calib.map_to_data(px, py) for px, py in pixels], dtype=np.float64)
+        max_err = np.max(np.abs(batch - scalar) / np.maximum(1.0, np.abs(scalar)))
+        if batch.shape == (len(pixels), 2) and max_err < 1e-4:
+            print(f"PASS: {name} batch matches scalar (max rel err {max_err:.2e})")
+        else:
+            print(f"FAIL: {name} batch mismatch (shape {batch.shape}, max rel err {max_err})")
+
+def test_point_decimation():
+    print("\n--- Testing Point Decimation Ordering ---")
+    image = create_synthetic_plot()
+    mask = create_mask(500, 300)
+    
+    processor = ImageProcessor()
+    points, skeleton = processor.process_images(image, mask, line_type='solid', min_distance=3)
+    
+    # Ordering must be X first, then Y
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    is_sorted = np.array_equal(order, np.arange(len(points)))
+    
+    # Every kept point must come from a distinct 3x3 cell
+    cells = {(int(x) // 3, int(y) // 3) for x, y in points}
+    unique_cells = len(cells) == len(points)
+    
+    # No decimation keeps every skeleton pixel
+    all_points, _ = processor.process_images(image, mask, line_type='solid', min_distance=0)
+    keeps_all = len(all_points) == np.count_nonzero(skeleton)
+    
+    print(f"Kept {len(points)} of {len(all_points)} skeleton pixels")
+    if is_sorted and unique_cells and keeps_all:
+        print("PASS: Decimation keeps (x, y) ordering and one point per cell")
+    else:
+        print(f"FAIL: sorted={is_sorted}, unique_cells={unique_cells}, keeps_all={keeps_all}")
+
+def test_thinning_fallback():
+    print("\n--- Testing NumPy Zhang-Suen Thinning ---")
+    mask = np.zeros((300, 500), dtype=np.uint8)
+    cv2.line(mask, (50, 150), (450, 150), 255, 9)  # 9px thick line, 401px long
+    
+    skeleton = zhang_suen_thinning(mask)
+    count = np.count_nonzero(skeleton)
+    rows = np.unique(np.nonzero(skeleton)[0])
+    print(f"Thick line: {np.count_nonzero(mask)} px -> skeleton {count} px on rows {rows.min()}-{rows.max()}")
+    
+    if count <= 401 and abs(int(rows.mean()) - 150) <= 1 and len(rows) <= 3:
+        print("PASS: Thick line thinned to its center line")
+    else:
+        print("FAIL: Skeleton not thin or off-center")
+    
+    if hasattr(cv2, 'ximgproc'):
+        if np.array_equal(skeleton, cv2.ximgproc.thinning(mask)):
+            print("PASS: Matches cv2.ximgproc.thinning")
+        else:
+            print("FAIL: Differs from cv2.ximgproc.thinning")
+
+def test_change_notifications():
+    print("\n--- Testing Project Change Notifications ---")
+    project = Project()
+    changes = []
+    project.add_observer(changes.append)
+    
+    project.add_series(Series("A"))
+    project.add_series(Series("B"))
+    project.remove_series(0)
+    project.update_calibration([(0, 0), (100, 0), (0, 0), (0, 100)], [(0, 0), (1, 0), (0, 0), (0, 1)])
+    project.clear_data()
+    print(f"Changes: {changes}")
+    
+    expected = [(CHANGE_SERIES_ADDED, 0), (CHANGE_SERIES_ADDED, 1), (CHANGE_SERIES_REMOVED, 0), (CHANGE_CALIBRATION, None)]
+    if changes[:4] == expected and changes[-1][0] == CHANGE_RESET:
+        print("PASS: Observers receive what changed, per series")
+    else:
+        print("FAIL: Unexpected change notifications")
+
+def test_progress_callback():
+    print("\n--- Testing Processing Progress Callback ---")
+    img = create_synthetic_plot()
+    mask = create_mask(img.shape[1], img.shape[0])
+    processor = ImageProcessor()
+    
+    stages = []
+    processor.process_images(img, mask, progress=stages.append)
+    print(f"Stages: {stages}")
+    
+    class Abort(Exception):
+        pass
+    def abort_at_skeleton(stage):
+        if stage == 'skeleton':
+            raise Abort()
+    try:
+        processor.process_images(img, mask, progress=abort_at_skeleton)
+        aborted = False
+    except Abort:
+        aborted = True
+    
+    if stages == ['mask', 'segment', 'morphology', 'skeleton'] and aborted:
+        print("PASS: Stages reported in order and callback can abort")
+    else:
+        print("FAIL: Unexpected stages or abort ignored")
+
+def test_stage_timings():
+    print("\n--- Testing Stage Timings ---")
+    img = create_synthetic_plot()
+    mask = create_mask(img.shape[1], img.shape[0])
+    processor = ImageProcessor()
+    
+    timer = StageTimer()
+    with timer.activate():
+        timed_points, _ = processor.process_images(img, mask)
+    timer.stop()
+    stages = timer.stages
+    print(f"Timings: {timer.summary()}")
+    
+    # Outside activate() nothing is recorded and results are unchanged
+    points, _ = processor.process_images(img, mask)
+    expected = ['hsv', 'inrange', 'gap_detection', 'morphology', 'skeleton', 'point_extraction']
+    
+    if (list(stages) == expected and all(s >= 0 for s in stages.values())
+            and sum(stages.values()) <= timer.elapsed and timer.stages == stages
+            and np.array_equal(points, timed_points)):
+        print("PASS: Every stage timed once, within the total")
+    else:
+        print(f"FAIL: Unexpected stage timings {stages}")
+
+def test_image_cache():
+    print("\n--- Testing Image Cache ---")
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "plot.png")
+    img = create_synthetic_plot()
+    cv2.imwrite(path, img)
+    mask = create_mask(img.shape[1], img.shape[0])
+    
+    cache = ImageCache()
+    first = cache.get(path)
+    hit = cache.get(path) is first
+    
+    # Cached HSV gives the same extraction as decoding from scratch
+    processor = ImageProcessor()
+    cached_points, _ = processor.process_images(first.bgr, mask, hsv_img=first.hsv)
+    plain_points, _ = processor.process_images(cv2.imread(path), mask)
+    same_result = np.array_equal(cached_points, plain_points)
+    
+    # Rewriting the file (new mtime/size) must not return the stale image
+    time.sleep(0.01)
+    cv2.imwrite(path, 255 - img)
+    reloaded = cache.get(path)
+    invalidated = reloaded is not first and np.array_equal(reloaded.bgr, 255 - img) and len(cache) == 1
+    
+    # Budget below two images: only the most recent one is kept
+    other = os.path.join(tmp, "other.png")
+    cv2.imwrite(other, img)
+    cache.max_bytes = reloaded.nbytes + 1
+    cache.get(other)
+    evicted = len(cache) == 1 and cache.get(other).nbytes <= cache.max_bytes
+    print(f"hit={hit}, same_result={same_result}, invalidated={invalidated}, evicted={evicted}")
+    
+    if hit and same_result and invalidated and evicted:
+        print("PASS: Image cache reuses decoded planes, tracks file changes and evicts LRU")
+    else:
+        print("FAIL: Image cache behaviour")
+
+def test_roi_crop_offsets():
+    print("\n--- Testing ROI-Cropped Processing ---")
+    img = create_synthetic_plot()
+    mask = create_mask(img.shape[1], img.shape[0])
+    processor = ImageProcessor()
+    points, skeleton = processor.process_images(img, mask)
+    
+    # Same plot placed inside a much larger blank scan
+    ox, oy = 1200, 800
+    big_img = np.full((img.shape[0] + 2 * oy, img.shape[1] + 2 * ox, 3), 255, dtype=np.uint8)
+    big_img[oy:oy + img.shape[0], ox:ox + img.shape[1]] = img
+    big_mask = np.zeros(big_img.shape[:2], dtype=np.uint8)
+    big_mask[oy:oy + img.shape[0], ox:ox + img.shape[1]] = mask
+    big_points, big_skeleton = processor.process_images(big_img, big_mask)
+    
+    same_points = np.array_equal(big_points, points + (ox, oy))
+    same_skeleton = big_skeleton.shape == big_mask.shape and np.array_equal(big_skeleton[oy:oy + img.shape[0], ox:ox + img.shape[1]], skeleton)
+    if same_points and same_skeleton:
+        print("PASS: Cropped processing maps points back to full-image coordinates")
+    else:
+        print(f"FAIL: points={same_points}, skeleton={same_skeleton}")
+
 if __name__ == "__main__":
     test_extraction_and_model()
     test_log_calibration()
+    test_batch_mapping()
+    test_point_decimation()
+    test_thinning_fallback()
+    test_change_notifications()
+    test_progress_callback()
+    test_stage_timings()
+    test_image_cache()
+    test_roi_crop_offsets()
@@ -0,0 +1,176 @@
+import sys
+import os
+import json
+import csv
+import tempfile
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.project import Project
+from core.series import Series
+
+def create_project(n_series=5, n_points=20000):
+    project = Project()
+    project.image_path = "plot.png"
+    project.update_calibration([(50, 250), (450, 250), (50, 250), (50, 50)], [(0, 0), (10, 0), (0, 0), (0, 1)])
+    for i in range(n_series):
+        xs = np.arange(n_points) % 400 + 50
+        ys = (150 + 80 * np.sin(xs / 50.0 + i)).astype(np.int64)
+        pixels = np.column_stack((xs, ys))
+        series = Series(f"Series {i+1}")
+        series.set_data(pixels, project.map_pixels(pixels))
+        series.target_hsv = (60, 200, 200) if i % 2 else None
+        project.add_series(series)
+    return project
+
+def same_series(a, b):
+    return (a.name == b.name and a.color.name() == b.color.name()
+            and a.target_hsv == b.target_hsv and a.line_type == b.line_type
+            and np.array_equal(a.raw_pixels, b.raw_pixels)
+            and np.allclose(a.data_points, b.data_points))
+
+def test_binary_round_trip():
+    print("--- Testing Binary Project Round Trip ---")
+    project = create_project()
+    tmp = tempfile.mkdtemp()
+    json_path = os.path.join(tmp, "project.json")
+    npz_path = os.path.join(tmp, "project.npz")
+
+    project.save_project(json_path)
+    project.save_project(npz_path)
+    json_size = os.path.getsize(json_path)
+    npz_size = os.path.getsize(npz_path)
+    print(f"JSON: {json_size / 1e6:.2f} MB, binary: {npz_size / 1e6:.2f} MB")
+
+    loaded = Project()
+    loaded.load_project(npz_path)
+    lazy_before = all(s._lazy_source is not None for s in loaded.series_list)
+    match = all(same_series(a, b) for a, b in zip(project.series_list, loaded.series_list))
+
+    if lazy_before and match and len(loaded.series_list) == len(project.series_list) and npz_size < json_size:
+        print("PASS: Binary project loads lazily and matches original")
+    else:
+        print(f"FAIL: lazy={lazy_before}, match={match}, smaller={npz_size < json_size}")
+
+    # Re-saving over the file the lazy arrays come from must not lose data
+    loaded.save_project(npz_path)
+    reloaded = Project()
+    reloaded.load_project(npz_path)
+    if all(same_series(a, b) for a, b in zip(project.series_list, reloaded.series_list)):
+        print("PASS: Overwriting a lazily loaded project keeps its data")
+    else:
+        print("FAIL: Data lost when overwriting a lazily loaded project")
+
+    # The project file stays open only while series are still lazy
+    npz = reloaded._npz
+    reloaded.close()
+    closed_ok = npz.fid is None and reloaded._npz is None and all(s._lazy_source is None for s in reloaded.series_list)
+    reloaded.load_project(npz_path)
+    npz, previous = reloaded._npz, reloaded.series_list
+    reloaded.load_project(json_path)
+    # Replaced series are not read from disk just to be dropped
+    reload_ok = npz.fid is None and reloaded._npz is None and all(s._lazy_source is not None for s in previous)
+    if closed_ok and reload_ok and all(same_series(a, b) for a, b in zip(project.series_list, reloaded.series_list)):
+        print("PASS: Binary project file closed on close() and re-load")
+    else:
+        print(f"FAIL: closed={closed_ok}, closed on re-load={reload_ok}")
+
+def test_legacy_json():
+    print("\n--- Testing Legacy JSON Project ---")
+    legacy = {
+        'image_path': 'plot.png',
+        'calibration': {
+            'pixel_points': [[50, 250], [450, 250], [50, 250], [50, 50]],
+            'graph_points': [[0, 0], [10, 0], [0, 0], [0, 1]],
+            'is_log_x': False, 'is_log_y': False, 'is_perspective': False
+        },
+        'series_list': [{
+            'name': 'Old', 'color': '#ff0000',
+            'raw_pixels': [[50, 250], [250, 150], [450, 50]],
+            'data_points': [[0.0, 0.0], [5.0, 0.5], [10.0, 1.0]],
+            'line_type': 'auto', 'gap_fill': 3
+        }]
+    }
+    path = os.path.join(tempfile.mkdtemp(), "legacy.json")
+    with open(path, 'w') as f:
+        json.dump(legacy, f, indent=4)
+
+    project = Project()
+    project.load_project(path)
+    series = project.series_list[0]
+    if series.raw_pixels.shape == (3, 2) and np.allclose(series.data_points[1], [5.0, 0.5]) and project.mask_path is None:
+        print("PASS: Legacy JSON loads into array-backed series")
+    else:
+        print("FAIL: Legacy JSON load mismatch")
+
+def test_streaming_csv():
+    print("\n--- Testing Streaming CSV Export ---")
+    project = create_project(n_series=3, n_points=1000)
+    # Uneven lengths so the wide layout needs padding
+    project.series_list[1].set_data(project.series_list[1].raw_pixels[:700], project.series_list[1].data_points[:700])
+    tmp = tempfile.mkdtemp()
+
+    wide_path = os.path.join(tmp, "wide.csv")
+    project.EXPORT_CHUNK_ROWS = 128  # Force several chunks
+    project.write_csv(wide_path)
+    with open(wide_path, newline='') as f:
+        rows = list(csv.reader(f))
+
+    header_ok = rows[0] == ["Series 1_X", "Series 1_Y", "Series 2_X", "Series 2_Y", "Series 3_X", "Series 3_Y"]
+    padded_ok = len(rows) == 1001 and rows[800][2:4] == ["", ""] and rows[700][2] != ""
+    values_ok = np.allclose([float(v) for v in rows[1000][4:6]], project.series_list[2].data_points[999])
+
+    long_path = os.path.join(tmp, "long.csv")
+    project.write_csv(long_path, layout='long')
+    with open(long_path, newline='') as f:
+        long_rows = list(csv.reader(f))
+    long_ok = long_rows[0] == ["Series", "X", "Y"] and len(long_rows) == 1 + 1000 + 700 + 1000 and long_rows[1001][0] == "Series 2"
+
+    if header_ok and padded_ok and values_ok and long_ok:
+        print("PASS: Wide and long CSV streamed correctly")
+    else:
+        print(f"FAIL: header={header_ok}, padded={padded_ok}, values={values_ok}, long={long_ok}")
+
+def test_traced_segments():
+    print("\n--- Testing Traced Series Segments ---")
+    project = create_project(n_series=2, n_points=100)
+    traced = project.series_list[1]
+    segments = np.repeat([0, 1, 2], [40, 35, 25])
+    traced.set_data(traced.raw_pixels, traced.data_points, segments)
+    tmp = tempfile.mkdtemp()
+
+    round_trips = []
+    for name in ("traced.json", "traced.npz"):
+        path = os.path.join(tmp, name)
+        project.save_project(path)
+        loaded = Project()
+        loaded.load_project(path)
+        round_trips.append(loaded.series_list[0].segments is None
+                           and np.array_equal(loaded.series_list[1].segments, segments))
+
+    wide_path = os.path.join(tmp, "wide.csv")
+    project.write_csv(wide_path)
+    with open(wide_path, newline='') as f:
+        rows = list(csv.reader(f))
+    wide_ok = (rows[0] == ["Series 1_X", "Series 1_Y", "Series 2_X", "Series 2_Y", "Series 2_Segment"]
+               and [int(r[4]) for r in rows[1:]] == segments.tolist())
+
+    long_path = os.path.join(tmp, "long.csv")
+    project.write_csv(long_path, layout='long')
+    with open(long_path, newline='') as f:
+        long_rows = list(csv.reader(f))
+    long_ok = (long_rows[0] == ["Series", "X", "Y", "Segment"] and long_rows[1][3] == ""
+               and [int(r[3]) for r in long_rows[101:]] == segments.tolist())
+
+    if all(round_trips) and wide_ok and long_ok:
+        print("PASS: Segments saved, loaded and exported per point")
+    else:
+        print(f"FAIL: round trips={round_trips}, wide={wide_ok}, long={long_ok}")
+
+if __name__ == "__main__":
+    test_binary_round_trip()
+    test_legacy_json()
+    test_streaming_csv()
+    test_traced_segments()
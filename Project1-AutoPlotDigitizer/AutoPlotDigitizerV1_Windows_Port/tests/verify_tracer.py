@@ -0,0 +1,147 @@
+import sys
+import os
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.tracer import SkeletonTracer
+from core.processor import ImageProcessor
+
+def thin(mask):
+    if hasattr(cv2, 'ximgproc'):
+        return cv2.ximgproc.thinning(mask)
+    return mask
+
+def test_vertical_and_loop():
+    print("--- Testing Tracer on Vertical Line & Circle ---")
+    skeleton = np.zeros((300, 400), dtype=np.uint8)
+    cv2.line(skeleton, (50, 20), (50, 280), 255, 1)        # Vertical line
+    cv2.circle(skeleton, (250, 150), 80, 255, 1)           # Closed loop
+
+    tracer = SkeletonTracer()
+    polylines = tracer.trace(skeleton)
+    print(f"Traced {len(polylines)} polylines")
+
+    if len(polylines) != 2:
+        print("FAIL: Expected 2 polylines (line + loop)")
+        return
+
+    line, loop = polylines
+    # Vertical line must be ordered along Y (sorting by X would scramble it)
+    steps = np.abs(np.diff(line, axis=0)).max(axis=1)
+    ordered_line = steps.max() == 1 and len(line) == 261
+
+    # Loop must be closed and cover every skeleton pixel once
+    closed = np.array_equal(loop[0], loop[-1])
+    covers = len(loop) - 1 + len(line) == np.count_nonzero(skeleton)
+
+    if ordered_line and closed and covers:
+        print("PASS: Vertical line ordered, circle traced as closed loop")
+    else:
+        print(f"FAIL: ordered_line={ordered_line}, closed={closed}, covers={covers}")
+
+def test_junction_split():
+    print("\n--- Testing Tracer Junction Split ---")
+    mask = np.zeros((200, 300), dtype=np.uint8)
+    cv2.line(mask, (20, 100), (280, 100), 255, 3)   # Horizontal
+    cv2.line(mask, (150, 100), (150, 180), 255, 3)  # Branch down (T junction)
+    skeleton = thin(mask)
+
+    polylines = SkeletonTracer().trace(skeleton)
+    long_paths = [p for p in polylines if len(p) > 10]
+    print(f"Traced {len(polylines)} polylines ({len(long_paths)} long)")
+
+    if len(long_paths) == 3:
+        print("PASS: T junction split into 3 branches")
+    else:
+        print("FAIL: Expected 3 branches at T junction")
+
+def test_every_pixel_traced():
+    print("\n--- Testing Tracer Covers Every Skeleton Pixel ---")
+    # 3x3 junction block: the center pixel only touches other junction pixels
+    block = np.zeros((6, 6), dtype=np.uint8)
+    block[1:4, 2:5] = 255
+    skeletons = [block]
+
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        mask = np.zeros((120, 160), dtype=np.uint8)
+        for _ in range(rng.integers(2, 8)):
+            (x1, y1), (x2, y2) = rng.integers(0, [160, 120], size=(2, 2)).tolist()
+            cv2.line(mask, (x1, y1), (x2, y2), 255, int(rng.integers(1, 6)))
+        skeletons.append(thin(mask))
+
+    missed = 0
+    for skeleton in skeletons:
+        covered = np.zeros(skeleton.shape, dtype=bool)
+        for p in SkeletonTracer().trace(skeleton):
+            covered[p[:, 1], p[:, 0]] = True
+        missed += np.count_nonzero((skeleton > 0) & ~covered)
+
+    if missed == 0:
+        print(f"PASS: Every pixel of {len(skeletons)} skeletons is in a polyline")
+    else:
+        print(f"FAIL: {missed} skeleton pixels in no polyline")
+
+def test_rdp_simplification():
+    print("\n--- Testing RDP Simplification ---")
+    xs = np.arange(0, 400)
+    ys = (150 + 100 * np.sin(xs / 400 * 2 * np.pi)).astype(np.int64)
+    polyline = np.column_stack((xs, ys))
+
+    simplified = SkeletonTracer.simplify(polyline, 1.0)
+
+    # Max vertical deviation of original points from the simplified curve
+    # (can exceed the perpendicular tolerance slightly on steep segments)
+    interp_y = np.interp(xs, simplified[:, 0], simplified[:, 1])
+    max_dev = np.max(np.abs(interp_y - ys))
+    print(f"{len(polyline)} -> {len(simplified)} points, max deviation {max_dev:.2f}px")
+
+    keeps_ends = np.array_equal(simplified[0], polyline[0]) and np.array_equal(simplified[-1], polyline[-1])
+    if len(simplified) * 10 <= len(polyline) and max_dev <= 2.0 and keeps_ends:
+        print("PASS: RDP reduces points within tolerance")
+    else:
+        print("FAIL: RDP reduction or tolerance check failed")
+
+def test_process_images_trace():
+    print("\n--- Testing process_images(trace=True) ---")
+    image = np.ones((300, 500, 3), dtype=np.uint8) * 255
+    xs = np.arange(50, 450)
+    ys = (150 + 80 * np.sin((xs - 50) / 400 * 2 * np.pi)).astype(np.int32)
+    cv2.polylines(image, [np.column_stack((xs, ys)).reshape(-1, 1, 2)], False, (0, 0, 0), 2)
+    mask = np.zeros((300, 500), dtype=np.uint8)
+    cv2.rectangle(mask, (40, 40), (460, 260), 255, -1)
+
+    processor = ImageProcessor()
+    raw, _ = processor.process_images(image, mask, line_type='solid', min_distance=0)
+    polylines, _ = processor.process_images(image, mask, line_type='solid', trace=True, simplify_tolerance=1.0)
+    traced, segments = ImageProcessor.join_polylines(polylines)
+    print(f"Raw skeleton: {len(raw)} points, traced + simplified: {len(traced)} points")
+
+    if 0 < len(traced) * 10 <= len(raw):
+        print("PASS: Traced output is at least 10x smaller")
+    else:
+        print("FAIL: Traced output not reduced enough")
+
+    # Two separate curves: the flattened points keep track of which polyline they came from
+    cv2.line(image, (60, 280), (440, 280), (0, 0, 0), 2)
+    mask[270:290, 40:460] = 255
+    polylines, _ = processor.process_images(image, mask, line_type='solid', trace=True, simplify_tolerance=1.0)
+    points, segments = ImageProcessor.join_polylines(polylines)
+    starts = np.flatnonzero(np.diff(segments)) + 1
+    bounds_ok = (len(polylines) >= 2 and len(segments) == len(points)
+                 and all(np.array_equal(points[i], p[0]) for i, p in zip(np.r_[0, starts], polylines)))
+    empty_points, empty_segments = ImageProcessor.join_polylines([])
+    if bounds_ok and empty_points.shape == (0, 2) and len(empty_segments) == 0:
+        print("PASS: Polyline boundaries survive flattening")
+    else:
+        print("FAIL: Polyline boundaries lost when flattening")
+
+if __name__ == "__main__":
+    test_vertical_and_loop()
+    test_junction_split()
+    test_every_pixel_traced()
+    test_rdp_simplification()
+    test_process_images_trace()
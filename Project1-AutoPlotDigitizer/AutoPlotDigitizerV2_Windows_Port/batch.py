@@ -0,0 +1,203 @@
+"""
+Headless batch digitization.
+
+Uses a saved project (.json or .npz) as a template: its calibration, mask and the
+settings of every series (target color, pattern mode, gap fill) are applied
+to each image of a folder. Writes one CSV per image plus a manifest.json.
+
+Example:
+    python batch.py scans/ --template datasheet.json --output results/ --workers 8
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from core.project import Project
+from core.series import Series
+from core.processor import ImageProcessor
+from core.stage_timer import StageTimer, stage
+
+IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.bmp", "*.tif", "*.tiff"]
+
+def load_mask(mask_path, image_shape):
+    """Reads the template mask, or covers the whole image if there is none."""
+    if mask_path:
+        mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+        if mask is None:
+            raise ValueError(f"Could not read mask: {mask_path}")
+        return mask
+    return np.full(image_shape[:2], 255, dtype=np.uint8)
+
+def load_template(template_path, mask_path=None):
+    """
+    Reads the template project once, in the parent process. Returns the small picklable
+    part the workers need: calibration, mask path and the settings of every series
+    (without their points).
+    """
+    template = Project()
+    template.load_project(template_path)
+    # Template without series: extract default dark lines once
+    template_series = template.series_list or [Series("Series 1")]
+    settings = {
+        'calibration': template.calibration.to_dict(),
+        'mask_path': mask_path or template.mask_path,
+        'series': [s.to_dict(include_points=False) for s in template_series]
+    }
+    template.clear_data() # Closes a binary template without loading its points
+    return settings
+
+def digitize_image(image_path, template, csv_path, trace=False, simplify_tolerance=None):
+    """
+    Worker: extracts every template series from one image and writes its CSV.
+    template: settings dict from load_template; csv_path: output file (see csv_names).
+    Returns a manifest entry (dict), including the seconds spent in each pipeline stage.
+    """
+    start = time.perf_counter()
+    timer = StageTimer()
+    entry = {'image': image_path, 'csv': None, 'series': [], 'seconds': 0.0, 'stages': {}, 'error': None}
+    try:
+        with timer.activate():
+            with stage('load'):
+                image = cv2.imread(image_path)
+            if image is None:
+                raise ValueError("Could not read image")
+            mask = load_mask(template['mask_path'], image.shape)
+
+            result = Project()
+            result.image_path = image_path
+            result.calibration.from_dict(template['calibration'])
+            processor = ImageProcessor()
+
+            for settings in template['series']:
+                series = Series.from_dict(settings)
+                points_px, _ = processor.process_images(
+                    image, mask,
+                    hsv_range=ImageProcessor.hsv_range_from_target(series.target_hsv),
+                    line_type=series.line_type,
+                    gap_fill=series.gap_fill,
+                    trace=trace,
+                    simplify_tolerance=simplify_tolerance
+                )
+                segments = None
+                if trace:
+                    # Keep each point's polyline index: the CSV gets a Segment column
+                    points_px, segments = ImageProcessor.join_polylines(points_px)
+                with stage('mapping'):
+                    data_points = result.map_pixels(points_px)
+                series.set_data(points_px, data_points, segments)
+                result.series_list.append(series)
+                entry['series'].append({'name': series.name, 'points': len(series.data_points)})
+
+            result.write_csv(csv_path)
+            entry['csv'] = csv_path
+
+    except Exception as e:
+        entry['error'] = str(e)
+
+    entry['seconds'] = time.perf_counter() - start
+    entry['stages'] = timer.stages
+    return entry
+
+def collect_images(input_dir):
+    paths = set()
+    for pattern in IMAGE_PATTERNS:
+        paths.update(glob.glob(os.path.join(input_dir, pattern)))
+        paths.update(glob.glob(os.path.join(input_dir, pattern.upper())))
+    return sorted(paths)
+
+def csv_names(image_paths):
+    """
+    Output CSV name of every image: its stem, or its full file name when several images
+    share a stem (a.png, a.jpg -> a.png.csv, a.jpg.csv), so no result overwrites another.
+    Names are compared case-insensitively, as Windows file names are.
+    """
+    stems = Counter(os.path.splitext(os.path.basename(p))[0].lower() for p in image_paths)
+    used, names = set(), {}
+    for path in image_paths:
+        base = os.path.basename(path)
+        stem = os.path.splitext(base)[0]
+        name = stem if stems[stem.lower()] == 1 else base
+        candidate, n = name, 1
+        while candidate.lower() in used: # e.g. a.png, a.jpg and a.png.bmp
+            n += 1
+            candidate = f"{name}_{n}"
+        used.add(candidate.lower())
+        names[path] = candidate + ".csv"
+    return names
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-digitize a folder of plot images using a project template.")
+    parser.add_argument("input_dir", help="Folder with plot images")
+    parser.add_argument("--template", required=True, help="Project .json/.npz used as template (calibration, mask, series colors)")
+    parser.add_argument("--mask", default=None, help="Mask image (overrides the template's mask_path)")
+    parser.add_argument("--output", default="batch_output", help="Output folder for CSVs and manifest.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--trace", action="store_true", help="Trace ordered polylines instead of raw skeleton pixels (adds a Segment column per series)")
+    parser.add_argument("--simplify", type=float, default=None, help="RDP tolerance in pixels (with --trace)")
+    args = parser.parse_args(argv)
+
+    images = collect_images(args.input_dir)
+    if not images:
+        print(f"No images found in {args.input_dir}")
+        return 1
+
+    try:
+        template = load_template(args.template, args.mask)
+    except Exception as e:
+        print(f"Could not load template {args.template}: {e}")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    print(f"Digitizing {len(images)} images with {args.workers} workers...")
+
+    start = time.perf_counter()
+    entries = []
+    names = csv_names(images)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(digitize_image, path, template, os.path.join(args.output, names[path]),
+                            args.trace, args.simplify)
+            for path in images
+        ]
+        for i, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            entries.append(entry)
+            status = f"ERROR: {entry['error']}" if entry['error'] else f"{sum(s['points'] for s in entry['series'])} points"
+            print(f"[{i}/{len(images)}] {os.path.basename(entry['image'])}: {status} ({entry['seconds']:.2f}s)")
+
+    elapsed = time.perf_counter() - start
+    entries.sort(key=lambda e: e['image'])
+    failed = sum(1 for e in entries if e['error'])
+    throughput = len(images) / elapsed if elapsed > 0 else 0.0
+    # Seconds per pipeline stage summed over all images (worker time, not wall time)
+    stage_seconds = {}
+    for e in entries:
+        for name, seconds in e['stages'].items():
+            stage_seconds[name] = stage_seconds.get(name, 0.0) + seconds
+
+    manifest = {
+        'template': args.template,
+        'input_dir': args.input_dir,
+        'images': len(images),
+        'failed': failed,
+        'elapsed_seconds': elapsed,
+        'images_per_second': throughput,
+        'stage_seconds': stage_seconds,
+        'results': entries
+    }
+    with open(os.path.join(args.output, "manifest.json"), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Done: {len(images) - failed} ok, {failed} failed in {elapsed:.1f}s ({throughput:.2f} images/s)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
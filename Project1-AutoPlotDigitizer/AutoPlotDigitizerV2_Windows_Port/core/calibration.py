@@ -138,6 +138,35 @@ class Calibrator:
 
         self.homography_matrix, _ = cv2.findHomography(src, dst)
 
+    def map_to_data_many(self, pixels):
+        """
+        Vectorized version of map_to_data.
+        pixels: (N, 2) array-like of (px, py)
+        Returns: (N, 2) float64 array of (x_data, y_data)
+        """
+        pts = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+        if len(pts) == 0:
+            return np.empty((0, 2), dtype=np.float64)
+
+        if self.homography_matrix is not None:
+            # Perspective Mapping (one call for all points)
+            linear = cv2.perspectiveTransform(pts.reshape(-1, 1, 2), self.homography_matrix).reshape(-1, 2)
+        else:
+            # Standard Linear Mapping
+            linear = np.empty_like(pts)
+            linear[:, 0] = self.x_offset + pts[:, 0] * self.x_scale
+            linear[:, 1] = self.y_offset + pts[:, 1] * self.y_scale
+
+        # Convert back if log scale (overflow -> inf, same as map_to_data)
+        if self.is_log_x or self.is_log_y:
+            with np.errstate(over='ignore'):
+                if self.is_log_x:
+                    linear[:, 0] = np.power(10.0, linear[:, 0])
+                if self.is_log_y:
+                    linear[:, 1] = np.power(10.0, linear[:, 1])
+
+        return linear
+
     def to_dict(self):
         return {
             'pixel_points': self.pixel_points,
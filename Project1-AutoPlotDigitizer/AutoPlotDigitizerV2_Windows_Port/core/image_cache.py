@@ -0,0 +1,106 @@
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+
+# Default memory budget for decoded images and their derived planes
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+class CachedImage:
+    """
+    A decoded image plus derived planes computed on first use.
+    Arrays are read-only because they are shared by every extraction.
+    """
+    __slots__ = ('bgr', '_hsv', '_gray', '_cache')
+
+    def __init__(self, bgr, cache=None):
+        bgr.flags.writeable = False
+        self.bgr = bgr
+        self._hsv = None
+        self._gray = None
+        self._cache = cache
+
+    def _derived(self, plane):
+        plane.flags.writeable = False
+        if self._cache is not None:
+            self._cache._trim() # Entry grew: keep the cache within budget
+        return plane
+
+    @property
+    def hsv(self):
+        if self._hsv is None:
+            self._hsv = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV)
+            self._derived(self._hsv)
+        return self._hsv
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+            self._derived(self._gray)
+        return self._gray
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.bgr, self._hsv, self._gray) if a is not None)
+
+class ImageCache:
+    """
+    LRU cache of decoded images keyed by (path, mtime, size), so an edited file is re-read.
+    Least recently used entries are evicted once max_bytes is exceeded (the most recent
+    entry is always kept). Safe to use from the extraction worker thread.
+    """
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # (path, mtime_ns, size) -> CachedImage
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(path):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def get(self, path):
+        """Returns the CachedImage for path, or None if it cannot be read (like cv2.imread)."""
+        try:
+            key = self._key(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        # Decode outside the lock; a concurrent miss on the same file only costs a second read
+        bgr = cv2.imread(path)
+        if bgr is None:
+            return None
+
+        with self._lock:
+            # Drop stale versions of the same file
+            for stale in [k for k in self._entries if k[0] == key[0]]:
+                del self._entries[stale]
+            entry = self._entries.setdefault(key, CachedImage(bgr, self))
+            self._entries.move_to_end(key)
+            self._trim()
+            return entry
+
+    def _trim(self):
+        with self._lock:
+            while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+                self._entries.popitem(last=False)
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,49 +1,104 @@
 import cv2
 import numpy as np
+from .tracer import SkeletonTracer
+from .thinning import zhang_suen_thinning
+from .stage_timer import stage
 
 class ImageProcessor:
     def __init__(self):
         pass
 
+    # Candidate gap sizes tested by auto_detect_gap (ascending)
+    TEST_GAPS = (1, 3, 5, 8, 12, 16)
+
     def auto_detect_gap(self, mask_img):
         """
         Tries different gap filling values and returns the best one.
         Best = Minimum number of connected components (ideally 1),
         with valid aspect ratio check if possible.
+        
+        Closing with a larger square kernel never splits components, so the
+        component count is non-increasing over TEST_GAPS. The best gap is the
+        smallest one reaching the count of the largest gap, which we find by
+        bisection on a bounding-box crop of the mask instead of testing every size.
         """
-        best_gap = 1
-        min_components = float('inf')
+        test_gaps = self.TEST_GAPS
         
-        # Test range of gap sizes
-        test_gaps = [1, 3, 5, 8, 12, 16]
+        # Crop to the mask's bounding box. Padding of 2*gap+1 keeps the closing
+        # identical to the full-frame one (nothing outside can be filled).
+        x, y, w, h = cv2.boundingRect(mask_img)
+        if w == 0 or h == 0:
+            return test_gaps[0]
         
-        for gap in test_gaps:
-            kernel_size = 2 * gap + 1
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
-            closed = cv2.morphologyEx(mask_img, cv2.MORPH_CLOSE, kernel)
-            
-            # Count connected components
-            num_labels, labels = cv2.connectedComponents(closed)
-            # num_labels includes background (0), so actual components = num_labels - 1
-            components = num_labels - 1
-            
-            if components < min_components:
-                min_components = components
-                best_gap = gap
-            
-            # Optimization: If we hit 1 component, that's likely best (closest to valid line)
-            if components == 1:
-                break
-                
-        print(f"DEBUG: Auto-detected gap fill: {best_gap} (components: {min_components})")
-        return best_gap
+        pad = 2 * test_gaps[-1] + 1
+        img_h, img_w = mask_img.shape[:2]
+        crop = mask_img[max(0, y - pad):min(img_h, y + h + pad),
+                        max(0, x - pad):min(img_w, x + w + pad)]
+        
+        counts = {}
+        def count_components(i):
+            if i not in counts:
+                kernel_size = 2 * test_gaps[i] + 1
+                kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
+                closed = cv2.morphologyEx(crop, cv2.MORPH_CLOSE, kernel)
+                # num_labels includes background (0), so actual components = num_labels - 1
+                num_labels, _ = cv2.connectedComponents(closed)
+                counts[i] = num_labels - 1
+            return counts[i]
+        
+        # Already one line at the smallest gap (typical solid line)
+        if count_components(0) <= 1:
+            best = 0
+        elif count_components(0) == count_components(len(test_gaps) - 1):
+            # Nothing merges within the tested range
+            best = 0
+        else:
+            # Smallest gap that reaches the minimum (= count at the largest gap)
+            target = count_components(len(test_gaps) - 1)
+            lo, hi = 0, len(test_gaps) - 1
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if count_components(mid) == target:
+                    hi = mid
+                else:
+                    lo = mid
+            best = hi
+        
+        return test_gaps[best]
 
-    def process_images(self, original_cv_img, mask_cv_img, hsv_range=None, line_type='auto', gap_fill=None):
+    @staticmethod
+    def hsv_range_from_target(target_hsv):
+        """
+        Builds the inRange bounds around a picked (h, s, v) color (OpenCV scale).
+        Returns None (= default dark lines) when no target is given.
+        """
+        if not target_hsv:
+            return None
+        h, s, v = target_hsv
+        lower = np.array([max(0, h-10), max(0, s-50), max(0, v-50)])
+        upper = np.array([min(180, h+10), min(255, s+50), min(255, v+50)])
+        return (lower, upper)
+
+    def process_images(self, original_cv_img, mask_cv_img, hsv_range=None, line_type='auto', gap_fill=None, min_distance=2.0,
+                       trace=False, simplify_tolerance=None, progress=None, hsv_img=None):
         """
         line_type: 'solid', 'manual', or 'auto' (default)
         gap_fill: integer (kernel size parameter) or None
+        min_distance: decimation grid size in pixels (<= 1 keeps every skeleton pixel)
+        trace: if True, follow the skeleton and return its polylines (split at junctions) instead of points
+        simplify_tolerance: RDP tolerance in pixels for traced polylines (None = no simplification)
+        progress: optional callback(stage) called before each stage ('mask', 'segment', 'morphology', 'skeleton');
+                  it may raise to abort the extraction
+        hsv_img: optional precomputed HSV of original_cv_img (e.g. from the project's ImageCache)
+        Stage durations are recorded in the active StageTimer, if any (see core.stage_timer).
+        Returns: (N, 2) int array of (x, y) sorted by X then Y, and the skeleton image.
+                 When tracing: a list of (Ni, 2) int arrays, one per polyline in path order, and the
+                 skeleton image. join_polylines flattens them while keeping each point's polyline index.
         """
+        report = progress or (lambda stage: None)
+        
         # 1. Resize mask to match original if needed
+        report('mask')
         if original_cv_img.shape[:2] != mask_cv_img.shape[:2]:
             mask_cv_img = cv2.resize(mask_cv_img, (original_cv_img.shape[1], original_cv_img.shape[0]))
 
@@ -55,11 +110,26 @@ class ImageProcessor:
             
         _, roi_mask = cv2.threshold(mask_gray, 10, 255, cv2.THRESH_BINARY)
         
-        # 3. Apply Mask to Original
-        masked_img = cv2.bitwise_and(original_cv_img, original_cv_img, mask=roi_mask)
+        # 3. Crop everything to the ROI's bounding box. Padding of 2*gap+1 (largest
+        # closing radius used below) keeps morphology and thinning identical to the full frame.
+        full_shape = roi_mask.shape
+        x, y, w, h = cv2.boundingRect(roi_mask)
+        if w == 0 or h == 0:
+            empty = [] if trace else np.empty((0, 2), dtype=np.int64)
+            return empty, np.zeros(full_shape, dtype=np.uint8)
+        pad = 2 * self._max_gap(line_type, gap_fill) + 1
+        x0, y0 = max(0, x - pad), max(0, y - pad)
+        x1, y1 = min(full_shape[1], x + w + pad), min(full_shape[0], y + h + pad)
+        roi_mask = roi_mask[y0:y1, x0:x1]
         
-        # 4. Color Segmentation
-        hsv = cv2.cvtColor(masked_img, cv2.COLOR_BGR2HSV)
+        # 4. Color Segmentation (no need to mask the image first: pixels outside
+        # the ROI are dropped when combining with roi_mask below)
+        report('segment')
+        if hsv_img is not None:
+            hsv = hsv_img[y0:y1, x0:x1]
+        else:
+            with stage('hsv'):
+                hsv = cv2.cvtColor(original_cv_img[y0:y1, x0:x1], cv2.COLOR_BGR2HSV)
         
         if hsv_range:
             lower, upper = hsv_range
@@ -68,64 +138,111 @@ class ImageProcessor:
             lower = np.array([0, 0, 0])
             upper = np.array([180, 255, 100]) 
         
-        mask_color = cv2.inRange(hsv, lower, upper)
-        
-        # Combine with user ROI
-        final_mask = cv2.bitwise_and(mask_color, roi_mask)
+        with stage('inrange'):
+            mask_color = cv2.inRange(hsv, lower, upper)
+            
+            # Combine with user ROI
+            final_mask = cv2.bitwise_and(mask_color, roi_mask)
         
         # 5. Morphological Operations based on Line Type
+        report('morphology')
         if line_type == 'solid':
             # Solid line: Opening to remove small noise
             kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-            closed_mask = cv2.morphologyEx(final_mask, cv2.MORPH_OPEN, kernel, iterations=1)
-            closed_mask = cv2.morphologyEx(closed_mask, cv2.MORPH_CLOSE, kernel, iterations=1)
+            with stage('morphology'):
+                closed_mask = cv2.morphologyEx(final_mask, cv2.MORPH_OPEN, kernel, iterations=1)
+                closed_mask = cv2.morphologyEx(closed_mask, cv2.MORPH_CLOSE, kernel, iterations=1)
             
         else: 
             # Dotted/Dashed or Auto: Use Closing to connect gaps
             
             if line_type == 'auto':
-                gap_val = self.auto_detect_gap(final_mask)
+                with stage('gap_detection'):
+                    gap_val = self.auto_detect_gap(final_mask)
             else:
                 # Manual
                 gap_val = int(gap_fill) if gap_fill is not None else 3
             
             kernel_size = 2 * gap_val + 1
             kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
-            closed_mask = cv2.morphologyEx(final_mask, cv2.MORPH_CLOSE, kernel)
+            with stage('morphology'):
+                closed_mask = cv2.morphologyEx(final_mask, cv2.MORPH_CLOSE, kernel)
         
         # 6. Skeletonization
-        if hasattr(cv2, 'ximgproc'):
-             skeleton = cv2.ximgproc.thinning(closed_mask)
-        else:
-            # Simple fallback thinning if ximgproc is missing
-            skeleton = closed_mask # Fallback, not true thinning but acceptable for simple centers
-            # Better fallback: erosion
-            # skeleton = cv2.erode(closed_mask, kernel, iterations=1)
-        
-        # 7. Extract coordinates
-        # Old approach: Average Y per X (Failed for vertical lines)
-        # New approach: specific non-zero pixels sorted by X
-        
-        ys, xs = np.nonzero(skeleton)
-        # Combine to (x, y) tuples
-        raw_points = list(zip(xs, ys))
-        
-        # Sort by X primarily, then Y
-        points = sorted(raw_points, key=lambda p: (p[0], p[1]))
-        
-        # Filter points to reduce density (remove clumps)
-        # Simple distance-based filtering
-        filtered_points = []
-        if points:
-            filtered_points.append(points[0])
-            last_p = points[0]
-            min_dist_sq = 2.0 * 2.0 # Minimum 2 pixels distance
+        report('skeleton')
+        with stage('skeleton'):
+            if hasattr(cv2, 'ximgproc'):
+                 skeleton = cv2.ximgproc.thinning(closed_mask)
+            else:
+                # Fallback if ximgproc (opencv-contrib) is missing: same Zhang-Suen algorithm in NumPy
+                skeleton = zhang_suen_thinning(closed_mask)
+        
+        full_skeleton = np.zeros(full_shape, dtype=np.uint8)
+        full_skeleton[y0:y1, x0:x1] = skeleton
+        
+        # 7. Extract coordinates (offset back to full-image pixels)
+        if trace:
+            with stage('tracing'):
+                polylines = self.trace_polylines(skeleton, simplify_tolerance)
+            return [p + (x0, y0) for p in polylines], full_skeleton
+        
+        with stage('point_extraction'):
+            # Specific non-zero pixels sorted by X, then Y (kept as an (N, 2) array)
+            ys, xs = np.nonzero(skeleton)
+            order = np.lexsort((ys, xs))
+            points = np.column_stack((xs[order] + x0, ys[order] + y0))
             
-            for p in points[1:]:
-                # Euclidean distance squared check
-                dist_sq = (p[0] - last_p[0])**2 + (p[1] - last_p[1])**2
-                if dist_sq >= min_dist_sq:
-                    filtered_points.append(p)
-                    last_p = p
+            # Filter points to reduce density (remove clumps)
+            filtered_points = self.decimate_points(points, min_distance)
                     
-        return filtered_points, skeleton
+        return filtered_points, full_skeleton
+
+    def _max_gap(self, line_type, gap_fill):
+        """Largest closing radius process_images may use for this line type"""
+        if line_type == 'solid':
+            return 1
+        if line_type == 'auto':
+            return max(self.TEST_GAPS)
+        return int(gap_fill) if gap_fill is not None else 3
+
+    def trace_polylines(self, skeleton, simplify_tolerance=None):
+        """
+        Converts a skeleton into ordered polylines (split at junctions),
+        optionally simplified with Ramer-Douglas-Peucker.
+        """
+        tracer = SkeletonTracer()
+        polylines = tracer.trace(skeleton)
+        if simplify_tolerance:
+            polylines = [tracer.simplify(p, simplify_tolerance) for p in polylines]
+        return polylines
+
+    @staticmethod
+    def join_polylines(polylines):
+        """
+        Flattens traced polylines into one (N, 2) point array plus an (N,) array
+        holding the index of the polyline each point belongs to, so consumers can
+        still tell where one path ends and the next begins.
+        """
+        if not polylines:
+            return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int32)
+        points = np.concatenate([np.asarray(p).reshape(-1, 2) for p in polylines])
+        segments = np.repeat(np.arange(len(polylines), dtype=np.int32), [len(p) for p in polylines])
+        return points, segments
+
+    @staticmethod
+    def decimate_points(points, min_distance=2.0):
+        """
+        Grid decimation: keeps the first point (in input order) of every
+        min_distance x min_distance cell, so the result keeps the input ordering.
+        points: (N, 2) array of (x, y)
+        """
+        points = np.asarray(points).reshape(-1, 2)
+        if len(points) == 0 or not min_distance or min_distance <= 1:
+            return points
+        
+        cells = (points // min_distance).astype(np.int64)
+        cells -= cells.min(axis=0)
+        keys = cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1]
+        
+        _, first_idx = np.unique(keys, return_index=True)
+        return points[np.sort(first_idx)]
@@ -1,13 +1,25 @@
 from .calibration import Calibrator
 from .series import Series
+from .image_cache import ImageCache
 import csv
 import json
+import zipfile
+import numpy as np
+
+# Change kinds passed to observers as (kind, series_index); index is None unless a single series changed
+CHANGE_RESET = 'reset'
+CHANGE_CALIBRATION = 'calibration'
+CHANGE_SERIES_ADDED = 'series_added'
+CHANGE_SERIES_REMOVED = 'series_removed'
 
 class Project:
     def __init__(self):
         self.image_path = None
+        self.mask_path = None # Optional saved extraction mask (used by batch templates)
         self.calibration = Calibrator()
         self.series_list = [] # List[Series]
+        self.image_cache = ImageCache() # Decoded image + HSV/gray shared by extractions (not saved)
+        self._npz = None # Binary project file lazily loaded series read from (see close)
         self._observers = []
 
     def set_image(self, path):
@@ -17,6 +29,7 @@ class Project:
 
     def clear_data(self):
         self.series_list = []
+        self.close()
         # We might want to keep calibration or reset it?
         # Typically new image = new calibration needed, but sometimes same setup.
         # For now, let's keep calibration object but it will be invalid until set.
@@ -25,72 +38,231 @@ class Project:
 
     def add_series(self, series: Series):
         self.series_list.append(series)
-        self.notify_observers()
+        self.notify_observers((CHANGE_SERIES_ADDED, len(self.series_list) - 1))
 
     def remove_series(self, index: int):
         if 0 <= index < len(self.series_list):
             self.series_list.pop(index)
-            self.notify_observers()
+            self.notify_observers((CHANGE_SERIES_REMOVED, index))
 
     def update_calibration(self, pixel_points, graph_values, is_log_x=False, is_log_y=False):
         self.calibration.set_calibration(pixel_points, graph_values, is_log_x, is_log_y)
-        self.notify_observers()
+        self.notify_observers((CHANGE_CALIBRATION, None))
 
     def update_calibration_perspective(self, pixel_points, graph_values, is_log_x=False, is_log_y=False):
         self.calibration.set_perspective_calibration(pixel_points, graph_values, is_log_x, is_log_y)
-        self.notify_observers()
+        self.notify_observers((CHANGE_CALIBRATION, None))
 
+    def map_pixels(self, pixels):
+        """Maps an (N, 2) array of pixel coordinates to data values in one pass"""
+        return self.calibration.map_to_data_many(pixels)
 
-    def get_csv_data(self):
-        """Returns header and rows for CSV export"""
-        if not self.series_list:
-            return [], []
+    # Rows formatted per chunk when streaming exports
+    EXPORT_CHUNK_ROWS = 8192
 
-        max_len = max(len(s.data_points) for s in self.series_list)
+    def _has_segments(self):
+        """True if any series was traced, i.e. carries polyline indices"""
+        return any(s.segments is not None for s in self.series_list)
+
+    def get_csv_header(self, layout='wide'):
+        if layout == 'long':
+            return ["Series", "X", "Y"] + (["Segment"] if self._has_segments() else [])
         header = []
         for s in self.series_list:
             header.append(f"{s.name}_X")
             header.append(f"{s.name}_Y")
+            if s.segments is not None:
+                header.append(f"{s.name}_Segment")
+        return header
 
-        rows = []
-        for i in range(max_len):
-            row = []
+    def get_csv_data(self, layout='wide'):
+        """
+        Returns header and a lazy row iterator for CSV export.
+        layout: 'wide' (one X/Y column pair per series, shorter series padded with "")
+                or 'long' (one row per point: series, x, y)
+        Traced series also get a Segment column: the polyline each point belongs to,
+        so separate paths are not mistaken for one continuous curve.
+        """
+        if not self.series_list:
+            return [], iter(())
+        return self.get_csv_header(layout), self._iter_rows(layout)
+
+    def _iter_rows(self, layout):
+        for chunk in self._iter_row_chunks(layout):
+            yield from chunk
+
+    def _iter_row_chunks(self, layout, chunk_rows=None):
+        """Yields lists of rows, converting only chunk_rows points per series at a time."""
+        chunk_rows = chunk_rows or self.EXPORT_CHUNK_ROWS
+        if layout == 'long':
+            traced = self._has_segments()
             for s in self.series_list:
-                if i < len(s.data_points):
-                    row.append(s.data_points[i][0])
-                    row.append(s.data_points[i][1])
-                else:
-                    row.append("")
-                    row.append("")
-            rows.append(row)
-            
-        return header, rows
+                data, segments = s.data_points, s.segments
+                for i in range(0, len(data), chunk_rows):
+                    rows = [[s.name, x, y] for x, y in data[i:i + chunk_rows].tolist()]
+                    if traced:
+                        ids = segments[i:i + chunk_rows].tolist() if segments is not None else [""] * len(rows)
+                        for row, segment in zip(rows, ids):
+                            row.append(segment)
+                    yield rows
+            return
+
+        max_len = max(len(s.data_points) for s in self.series_list)
+        for i in range(0, max_len, chunk_rows):
+            n = min(chunk_rows, max_len - i)
+            columns = []
+            for s in self.series_list:
+                part = s.data_points[i:i + n]
+                pad = [""] * (n - len(part))
+                columns.append(part[:, 0].tolist() + pad)
+                columns.append(part[:, 1].tolist() + pad)
+                if s.segments is not None:
+                    columns.append(s.segments[i:i + n].tolist() + pad)
+            yield [list(row) for row in zip(*columns)]
+
+    def write_csv(self, filepath, layout='wide'):
+        """Streams the CSV to disk chunk by chunk (memory stays bounded for large series)."""
+        with open(filepath, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.get_csv_header(layout))
+            if self.series_list:
+                for chunk in self._iter_row_chunks(layout):
+                    writer.writerows(chunk)
+
+    def write_parquet(self, filepath, layout='long'):
+        """Writes the series to Parquet (requires the optional pyarrow package)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        if layout == 'long':
+            names, xs, ys, segments = [], [], [], []
+            for s in self.series_list:
+                n = len(s.data_points)
+                names.append(np.full(n, s.name, dtype=object))
+                xs.append(s.data_points[:, 0])
+                ys.append(s.data_points[:, 1])
+                segments.append(s.segments if s.segments is not None else np.full(n, -1, dtype=np.int32))
+            columns = {
+                'series': pa.array(np.concatenate(names) if names else [], type=pa.string()).dictionary_encode(),
+                'x': pa.array(np.concatenate(xs) if xs else [], type=pa.float64()),
+                'y': pa.array(np.concatenate(ys) if ys else [], type=pa.float64())
+            }
+            if self._has_segments():
+                values = np.concatenate(segments)
+                columns['segment'] = pa.array(values, mask=values < 0) # Null for untraced series
+            table = pa.table(columns)
+        else:
+            max_len = max((len(s.data_points) for s in self.series_list), default=0)
+            columns = {}
+            for s in self.series_list:
+                n = len(s.data_points)
+                missing = np.arange(max_len) >= n
+                for axis, suffix in ((0, 'X'), (1, 'Y')):
+                    values = np.zeros(max_len, dtype=np.float64)
+                    values[:n] = s.data_points[:, axis]
+                    columns[f"{s.name}_{suffix}"] = pa.array(values, mask=missing)
+                if s.segments is not None:
+                    values = np.zeros(max_len, dtype=np.int32)
+                    values[:n] = s.segments
+                    columns[f"{s.name}_Segment"] = pa.array(values, mask=missing)
+            table = pa.table(columns)
+
+        pq.write_table(table, filepath)
+
+    # Binary project container: zip with manifest.json + one .npy per array
+    BINARY_EXTENSIONS = ('.npz', '.apdz')
+    BINARY_FORMAT = 'autoplotdigitizer-project'
+    BINARY_VERSION = 1
+
+    def close(self):
+        """Loads any lazily loaded series into memory and closes the binary project file they came from."""
+        if self._npz is None:
+            return
+        for s in self.series_list:
+            s._load_lazy()
+        self._npz.close()
+        self._npz = None
 
     def save_project(self, filepath):
+        if filepath.lower().endswith(self.BINARY_EXTENSIONS):
+            self.save_project_binary(filepath)
+            return
+
+        self.close()
         data = {
             'image_path': self.image_path,
+            'mask_path': self.mask_path,
             'calibration': self.calibration.to_dict(),
             'series_list': [s.to_dict() for s in self.series_list]
         }
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=4)
 
+    def save_project_binary(self, filepath):
+        """Writes a JSON manifest plus raw .npy arrays into one (uncompressed) zip."""
+        # Materialize lazily loaded series first: filepath may be the file they are read from
+        self.close()
+        arrays = [{'raw_pixels': s.raw_pixels, 'data_points': s.data_points, 'segments': s.segments}
+                  for s in self.series_list]
+        
+        series_meta = []
+        with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_STORED) as zf:
+            for i, (s, fields) in enumerate(zip(self.series_list, arrays)):
+                meta = s.to_dict(include_points=False)
+                meta['arrays'] = {}
+                for field, arr in fields.items():
+                    if arr is None:
+                        continue # Untraced series have no segments
+                    name = f"series_{i}_{field}.npy"
+                    with zf.open(name, 'w') as f:
+                        np.lib.format.write_array(f, np.ascontiguousarray(arr))
+                    meta['arrays'][field] = name
+                series_meta.append(meta)
+
+            manifest = {
+                'format': self.BINARY_FORMAT,
+                'version': self.BINARY_VERSION,
+                'image_path': self.image_path,
+                'mask_path': self.mask_path,
+                'calibration': self.calibration.to_dict(),
+                'series_list': series_meta
+            }
+            zf.writestr('manifest.json', json.dumps(manifest, indent=4))
+
     def load_project(self, filepath):
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+        npz = None
+        if zipfile.is_zipfile(filepath):
+            # Binary container: arrays stay on disk until a series is accessed (kept open until close)
+            npz = np.load(filepath, allow_pickle=False)
+            data = json.loads(npz['manifest.json']) if 'manifest.json' in npz.files else {}
+            if data.get('format') != self.BINARY_FORMAT:
+                npz.close()
+                raise ValueError("Not an AutoPlotDigitizer project file")
+        else:
+            # Legacy JSON
+            with open(filepath, 'r') as f:
+                data = json.load(f)
             
+        # The previous series are replaced: close their file without loading what is still lazy
+        self.series_list = []
+        self.close()
         self.image_path = data.get('image_path')
+        self.mask_path = data.get('mask_path')
         self.calibration.from_dict(data.get('calibration', {}))
         
-        self.series_list = []
         for s_data in data.get('series_list', []):
-            self.series_list.append(Series.from_dict(s_data))
+            self.series_list.append(Series.from_dict(s_data, npz=npz))
+        self._npz = npz
             
         self.notify_observers()
 
     def add_observer(self, callback):
+        """callback(change): change is (kind, series_index), see CHANGE_* above"""
         self._observers.append(callback)
 
-    def notify_observers(self):
+    def notify_observers(self, change=(CHANGE_RESET, None)):
         for callback in self._observers:
-            callback()
+            callback(change)
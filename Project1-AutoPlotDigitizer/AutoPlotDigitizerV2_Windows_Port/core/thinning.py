@@ -0,0 +1,70 @@
+import numpy as np
+
+# Neighbor order used by Zhang-Suen: P2 (north) clockwise to P9 (north-west), as (dy, dx)
+ZS_NEIGHBORS = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
+def _build_lookup_tables():
+    """
+    Deletion tables for both Zhang-Suen sub-iterations, indexed by the 8-bit
+    neighbor code (bit i set = neighbor ZS_NEIGHBORS[i] is foreground).
+    """
+    codes = np.arange(256)
+    bits = (codes[:, None] >> np.arange(8)) & 1  # columns: P2..P9
+    p2, p3, p4, p5, p6, p7, p8, p9 = bits.T
+
+    # B: number of foreground neighbors, A: number of 0->1 transitions in P2..P9,P2
+    b = bits.sum(axis=1)
+    a = ((bits == 0) & (np.roll(bits, -1, axis=1) == 1)).sum(axis=1)
+    base = (a == 1) & (b >= 2) & (b <= 6)
+
+    first = base & (p2 * p4 * p6 == 0) & (p4 * p6 * p8 == 0)
+    second = base & (p2 * p4 * p8 == 0) & (p2 * p6 * p8 == 0)
+    return first.astype(np.uint8), second.astype(np.uint8)
+
+ZS_LUT_FIRST, ZS_LUT_SECOND = _build_lookup_tables()
+
+def zhang_suen_thinning(binary_img):
+    """
+    Pure NumPy Zhang-Suen thinning (same algorithm as cv2.ximgproc.thinning).
+    Works on whole arrays: each sub-iteration encodes every pixel's neighborhood
+    as an 8-bit code and deletes pixels through a lookup table.
+    binary_img: 8-bit single-channel image, non-zero = foreground
+    Returns: uint8 skeleton with 255 for foreground, same shape as the input
+    """
+    src = np.asarray(binary_img)
+    skeleton = np.zeros(src.shape, dtype=np.uint8)
+
+    ys, xs = np.nonzero(src)
+    if len(xs) == 0:
+        return skeleton
+
+    # Work on the bounding box plus a 1px zero border
+    y0, y1 = ys.min(), ys.max() + 1
+    x0, x1 = xs.min(), xs.max() + 1
+    img = np.zeros((y1 - y0 + 2, x1 - x0 + 2), dtype=np.uint8)
+    img[1:-1, 1:-1] = src[y0:y1, x0:x1] > 0
+
+    # Pixels on the image border are never deleted (matches ximgproc)
+    interior = np.zeros(img.shape, dtype=bool)
+    interior[1 + (y0 == 0):img.shape[0] - 1 - (y1 == src.shape[0]),
+             1 + (x0 == 0):img.shape[1] - 1 - (x1 == src.shape[1])] = True
+
+    h, w = img.shape
+    code = np.empty((h - 2, w - 2), dtype=np.uint8)
+    changed = True
+    while changed:
+        changed = False
+        for lut in (ZS_LUT_FIRST, ZS_LUT_SECOND):
+            code.fill(0)
+            for bit, (dy, dx) in enumerate(ZS_NEIGHBORS):
+                code |= img[1 + dy:h - 1 + dy, 1 + dx:w - 1 + dx] << bit
+
+            delete = np.zeros(img.shape, dtype=bool)
+            delete[1:-1, 1:-1] = (lut[code] == 1) & (img[1:-1, 1:-1] == 1)
+            delete &= interior
+            if delete.any():
+                img[delete] = 0
+                changed = True
+
+    skeleton[y0:y1, x0:x1] = img[1:-1, 1:-1] * 255
+    return skeleton
@@ -0,0 +1,135 @@
+import numpy as np
+
+# 8-neighborhood offsets (dx, dy); orthogonal first so walks prefer them
+NEIGHBOR_OFFSETS = [(1, 0), (0, 1), (-1, 0), (0, -1), (1, 1), (-1, 1), (-1, -1), (1, -1)]
+
+class SkeletonTracer:
+    """Follows 8-connected skeleton paths and emits ordered polylines split at junctions"""
+
+    def trace(self, skeleton):
+        """
+        skeleton: binary image (non-zero = skeleton pixel), ideally 1px wide
+        Returns: List of (K, 2) int arrays of (x, y), each an ordered path.
+        Open paths run between endpoints/junctions, closed loops repeat their first point.
+        """
+        ys, xs = np.nonzero(skeleton)
+        if len(xs) == 0:
+            return []
+
+        # Visit pixels in X, then Y order so open curves start at their left end
+        order = np.lexsort((ys, xs))
+        xs, ys = xs[order], ys[order]
+        n = len(xs)
+
+        # Pixel index lookup, padded by 1 so neighbor lookups never leave the array
+        h, w = skeleton.shape[:2]
+        index = np.full((h + 2, w + 2), -1, dtype=np.int64)
+        index[ys + 1, xs + 1] = np.arange(n)
+
+        neighbors = np.empty((n, 8), dtype=np.int64)
+        for k, (dx, dy) in enumerate(NEIGHBOR_OFFSETS):
+            neighbors[:, k] = index[ys + 1 + dy, xs + 1 + dx]
+
+        # Drop diagonal links that are already bridged by an orthogonal pixel
+        # (staircase corners), otherwise every step of a diagonal line looks like a junction
+        for k in range(4, 8):
+            dx, dy = NEIGHBOR_OFFSETS[k]
+            bridged = (index[ys + 1, xs + 1 + dx] >= 0) | (index[ys + 1 + dy, xs + 1] >= 0)
+            neighbors[bridged, k] = -1
+
+        degree = (neighbors >= 0).sum(axis=1)
+        is_node = degree != 2
+
+        adjacency = [[m for m in row if m >= 0] for row in neighbors.tolist()]
+        node_flags = is_node.tolist()
+        visited = bytearray(n)
+        paths = []
+
+        def walk(start, first):
+            path = [start, first]
+            prev, cur = start, first
+            while not node_flags[cur]:
+                visited[cur] = 1
+                a, b = adjacency[cur]
+                nxt = b if a == prev else a
+                path.append(nxt)
+                if nxt == start:  # Closed loop
+                    break
+                prev, cur = cur, nxt
+            return path
+
+        # Junction clusters (adjacent pixels of degree >= 3) are linked by a spanning tree:
+        # every pixel appears in some path and the branches meeting there stay connected,
+        # without a 2-point path for every link inside the cluster
+        cluster = list(range(n))
+
+        def root(i):
+            while cluster[i] != i:
+                cluster[i] = cluster[cluster[i]]
+                i = cluster[i]
+            return i
+
+        # 1. Open paths: start at every endpoint/junction
+        for node in np.flatnonzero(is_node).tolist():
+            if degree[node] == 0:
+                paths.append([node])  # Isolated pixel (e.g. a dot)
+                continue
+            for m in adjacency[node]:
+                if node_flags[m]:
+                    # Direct node-node link: keep once
+                    if node < m and (degree[node] < 3 or degree[m] < 3):
+                        paths.append([node, m])
+                    elif node < m and root(node) != root(m):
+                        cluster[root(node)] = root(m)
+                        paths.append([node, m])
+                elif not visited[m]:
+                    paths.append(walk(node, m))
+
+        # 2. Closed loops without any node (e.g. circles)
+        for start in np.flatnonzero(~is_node).tolist():
+            if not visited[start]:
+                visited[start] = 1
+                paths.append(walk(start, adjacency[start][0]))
+
+        points = np.column_stack((xs, ys))
+        return [points[p] for p in paths]
+
+    @staticmethod
+    def simplify(polyline, tolerance):
+        """
+        Ramer-Douglas-Peucker simplification.
+        polyline: (K, 2) array, tolerance: max deviation in pixels
+        Returns: (M, 2) array with M <= K, keeping both end points
+        """
+        polyline = np.asarray(polyline)
+        if len(polyline) < 3 or not tolerance or tolerance <= 0:
+            return polyline
+
+        pts = polyline.astype(np.float64)
+        keep = np.zeros(len(pts), dtype=bool)
+        keep[0] = keep[-1] = True
+
+        stack = [(0, len(pts) - 1)]
+        while stack:
+            first, last = stack.pop()
+            if last - first < 2:
+                continue
+
+            start, end = pts[first], pts[last]
+            seg = end - start
+            seg_len = np.hypot(seg[0], seg[1])
+            inner = pts[first + 1:last] - start
+            if seg_len == 0:
+                # Closed loop: distance to the shared end point
+                dists = np.hypot(inner[:, 0], inner[:, 1])
+            else:
+                dists = np.abs(seg[0] * inner[:, 1] - seg[1] * inner[:, 0]) / seg_len
+
+            i = int(np.argmax(dists))
+            if dists[i] > tolerance:
+                split = first + 1 + i
+                keep[split] = True
+                stack.append((first, split))
+                stack.append((split, last))
+
+        return polyline[keep]
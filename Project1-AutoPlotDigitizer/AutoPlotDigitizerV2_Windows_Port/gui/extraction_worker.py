@@ -0,0 +1,99 @@
+import cv2
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from core.processor import ImageProcessor
+from core.stage_timer import StageTimer, stage
+
+# Progress (percent) reported when each stage starts
+STAGE_PROGRESS = {
+    'load': 0,
+    'mask': 10,
+    'segment': 25,
+    'morphology': 40,
+    'skeleton': 65,
+    'mapping': 90,
+}
+
+class ExtractionCancelled(Exception):
+    pass
+
+class ExtractionSignals(QObject):
+    progress = Signal(int, str, int) # job_id, stage, percent
+    finished = Signal(int, object, object, object) # job_id, points_px, data_points, segments (None unless traced)
+    failed = Signal(int, str) # job_id, error message
+    cancelled = Signal(int) # job_id
+
+class ExtractionJob(QRunnable):
+    """
+    Runs one series extraction (imread, ImageProcessor pipeline, pixel -> data mapping)
+    off the GUI thread. Everything it needs is captured when the job is created, so
+    later edits in the UI do not affect a queued job. Results are only emitted:
+    adding the series to the Project happens in the receiving (GUI thread) slot.
+    """
+    def __init__(self, job_id, image_path, mask_arr, calibration, hsv_range=None, line_type='auto', gap_fill=None,
+                 trace=False, simplify_tolerance=None, image_cache=None):
+        super().__init__()
+        self.job_id = job_id
+        self.image_path = image_path
+        self.mask_arr = mask_arr
+        self.calibration = calibration # Snapshot (copy) of the project's Calibrator
+        self.hsv_range = hsv_range
+        self.line_type = line_type
+        self.gap_fill = gap_fill
+        self.trace = trace
+        self.simplify_tolerance = simplify_tolerance
+        self.image_cache = image_cache # Project's ImageCache; None = decode from disk every time
+        self.signals = ExtractionSignals()
+        self.timer = None # StageTimer of the run (per-stage durations), complete once a signal is emitted
+        self._cancelled = False
+
+    def cancel(self):
+        """Requests cancellation; honoured at the next stage boundary."""
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled
+
+    def _enter_stage(self, stage):
+        if self._cancelled:
+            raise ExtractionCancelled()
+        self.signals.progress.emit(self.job_id, stage, STAGE_PROGRESS[stage])
+
+    def run(self):
+        self.timer = StageTimer()
+        try:
+            with self.timer.activate():
+                self._enter_stage('load')
+                with stage('load'):
+                    if self.image_cache is not None:
+                        cached = self.image_cache.get(self.image_path)
+                        original_cv_img, hsv_img = (cached.bgr, cached.hsv) if cached is not None else (None, None)
+                    else:
+                        original_cv_img, hsv_img = cv2.imread(self.image_path), None
+                if original_cv_img is None:
+                    raise ValueError(f"Could not read image: {self.image_path}")
+
+                processor = ImageProcessor()
+                points_px, _ = processor.process_images(original_cv_img, self.mask_arr, hsv_range=self.hsv_range,
+                                                        line_type=self.line_type, gap_fill=self.gap_fill,
+                                                        trace=self.trace, simplify_tolerance=self.simplify_tolerance,
+                                                        progress=self._enter_stage, hsv_img=hsv_img)
+                segments = None
+                if self.trace:
+                    points_px, segments = ImageProcessor.join_polylines(points_px)
+
+                self._enter_stage('mapping')
+                with stage('mapping'):
+                    data_points = self.calibration.map_to_data_many(points_px)
+        except ExtractionCancelled:
+            self.signals.cancelled.emit(self.job_id)
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+        finally:
+            self.timer.stop()
+
+        self.signals.finished.emit(self.job_id, points_px, data_points, segments)
@@ -1,14 +1,19 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, session
 from werkzeug.utils import secure_filename
 import os
+import shutil
+import uuid
 import cv2
 import numpy as np
-import base64
 import json
 from io import BytesIO
 import csv
-from core.auto_detector import AutoDetector
+from core.calibration import Calibrator
 from core.logger import setup_logger
+from core.session_store import SessionStore
+from core.detector_cache import DetectorCache
+from core.debug_trace import DebugTrace
+from core.stage_timer import StageTimer, stage
 
 # Setup Logger
 logger = setup_logger('app')
@@ -35,12 +40,42 @@ app.json = CustomJSONProvider(app)
 
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
+BROWSER_IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'}
+PREVIEW_SIZE = 1024  # Longest side of the preview advertised by /upload
+IMAGE_MAX_AGE = 24 * 3600  # Seconds browsers may cache /image responses
+# Signs the session cookie. Set AUTOPLOT_SECRET_KEY to keep sessions valid across restarts.
+app.secret_key = os.environ.get('AUTOPLOT_SECRET_KEY') or os.urandom(32)
 
 # Ensure upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-# Global storage for session data
-session_data: dict = {}
+def _session_upload_folder(session_id: str) -> str:
+    return os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+
+def _discard_session(session_id: str, data: dict, reason: str) -> None:
+    logger.info(f"Session {session_id} {reason}, deleting its uploads")
+    shutil.rmtree(_session_upload_folder(session_id), ignore_errors=True)
+
+# Per-browser state (image, calibration), kept in memory: the app must run as a single
+# process (threads are fine, e.g. waitress or gunicorn --workers 1 --threads N)
+sessions = SessionStore(
+    max_sessions=int(os.environ.get('AUTOPLOT_MAX_SESSIONS', 100)),
+    ttl_seconds=float(os.environ.get('AUTOPLOT_SESSION_TTL', 2 * 3600)),
+    on_evict=_discard_session
+)
+
+# Debug/tracing mode, off by default: AUTOPLOT_DEBUG_DIR=<dir> logs pipeline details
+# and saves intermediate images there (written in the background)
+debug_trace = DebugTrace(os.environ.get('AUTOPLOT_DEBUG_DIR'), logger=logger)
+
+# Detectors (decoded image + HSV/edges/axes) shared by all sessions, keyed by image content
+detectors = DetectorCache(max_entries=int(os.environ.get('AUTOPLOT_DETECTOR_CACHE', 8)), debug=debug_trace)
+
+def current_session() -> dict:
+    """State dict of the requesting browser session (identified by a signed cookie)"""
+    if 'sid' not in session:
+        session['sid'] = uuid.uuid4().hex
+    return sessions.get(session['sid'])
 
 @app.route('/')
 def index():
@@ -62,31 +97,89 @@ def upload_image():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     
+    session_data = current_session()
+    
+    # Each session uploads into its own folder so equal file names do not collide
     filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    upload_folder = _session_upload_folder(session['sid'])
+    os.makedirs(upload_folder, exist_ok=True)
+    filepath = os.path.join(upload_folder, filename)
     file.save(filepath)
     
-    # Read image and get dimensions
-    img = cv2.imread(filepath)
-    height, width = img.shape[:2]
-    
-    # Convert to base64 for display
-    _, buffer = cv2.imencode('.png', img)
-    img_base64 = base64.b64encode(buffer).decode('utf-8')
+    # The content hash is the image id. Decoding goes through the detector cache,
+    # so the first detection on this image reuses it.
+    image_id = DetectorCache.content_hash(filepath)
+    try:
+        detector = detectors.get(filepath, image_id)
+    except cv2.error:
+        return jsonify({'error': 'Could not read image'}), 400
+    width, height = detector.width, detector.height
     
     session_data['image_path'] = filepath
     session_data['image_size'] = (width, height)
+    session_data['image_hash'] = image_id
     
+    # Browsers cannot show every upload format (e.g. TIFF): those are displayed through a PNG preview
+    displayable = os.path.splitext(filename)[1].lower() in BROWSER_IMAGE_EXTENSIONS
     return jsonify({
         'success': True,
-        'image': f'data:image/png;base64,{img_base64}',
+        'image_id': image_id,
+        'image_url': f'/image/{image_id}' if displayable else f'/image/{image_id}/preview',
+        'preview_url': f'/image/{image_id}/preview?max_size={PREVIEW_SIZE}',
         'width': width,
         'height': height
     })
 
+def _session_image_path(image_id: str):
+    """Path of the requesting session's upload with this id, None for anything else"""
+    session_data = current_session()
+    if session_data.get('image_hash') != image_id:
+        return None
+    return session_data['image_path']
+
+def _cacheable(response, etag: str):
+    # Image ids are content hashes, so a given URL never changes
+    response.set_etag(etag)
+    response.cache_control.no_cache = None  # send_file adds it by default
+    response.cache_control.private = True
+    response.cache_control.max_age = IMAGE_MAX_AGE
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+@app.route('/image/<image_id>')
+def get_image(image_id):
+    """Streams the original uploaded bytes (304 when the browser already has them)"""
+    filepath = _session_image_path(image_id)
+    if filepath is None:
+        return jsonify({'error': 'Image not found'}), 404
+    response = send_file(os.path.abspath(filepath), conditional=False)
+    return _cacheable(response, image_id)
+
+@app.route('/image/<image_id>/preview')
+def get_image_preview(image_id):
+    """PNG of the upload downscaled to fit max_size pixels (0 = full resolution)"""
+    filepath = _session_image_path(image_id)
+    if filepath is None:
+        return jsonify({'error': 'Image not found'}), 404
+    max_size = request.args.get('max_size', 0, type=int)
+    etag = f"{image_id}-{max_size}"
+    if etag in request.if_none_match:
+        return _cacheable(app.response_class(status=304), etag)
+    
+    image = detectors.get(filepath, image_id).image
+    height, width = image.shape[:2]
+    scale = max_size / max(width, height) if max_size > 0 else 1.0
+    if scale < 1.0:
+        image = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+    _, buffer = cv2.imencode('.png', image)
+    
+    response = send_file(BytesIO(buffer.tobytes()), mimetype='image/png')
+    return _cacheable(response, etag)
+
 @app.route('/calibrate', methods=['POST'])
 def calibrate():
     data = request.json
+    session_data = current_session()
     session_data['calibration'] = {
         'points': data['points'],  # [(x1,y1), (x2,y2), (y1_x,y1_y), (y2_x,y2_y)]
         'values': data['values']   # [x1_val, x2_val, y1_val, y2_val]
@@ -95,6 +188,16 @@ def calibrate():
 
 @app.route('/detect_auto', methods=['POST'])
 def detect_auto():
+    # Stage timings of this request: logged, and returned in the 'timings' field
+    timer = StageTimer()
+    with timer.activate():
+        response = _detect_auto(timer)
+    timer.stop()
+    logger.info(f"/detect_auto timings: {timer.summary()}")
+    return response
+
+def _detect_auto(timer: StageTimer):
+    session_data = current_session()
     if 'image_path' not in session_data:
         return jsonify({'error': 'No image uploaded'}), 400
     
@@ -102,7 +205,8 @@ def detect_auto():
     mode = data.get('mode', 'full_auto')
     n_series = data.get('n_series', 3)
     
-    detector = AutoDetector(session_data['image_path'])
+    with stage('load'):
+        detector = detectors.get(session_data['image_path'], session_data.get('image_hash'))
     
     if mode == 'full_auto':
         # Detect axes
@@ -118,30 +222,24 @@ def detect_auto():
         return jsonify({
             'success': True,
             'axes': endpoints,
-            'series': series_list
+            'series': series_list,
+            'timings': timer.as_dict()
         })
     
     elif mode == 'guided':
         colors = data.get('colors', [])
         detection_method = data.get('detection_method', 'color')
         
-        # DEBUG: Log incoming data structure
-        print(f"DEBUG_REQUEST: Buttons={detection_method}, Colors={len(colors)}")
-        
         # FIX: Try get calibration from request, else from session
         calibration = data.get('calibration') 
+        calibration_source = 'request'
         if not calibration:
-            print("DEBUG_REQUEST: Calibration missing in body, checking session...")
             calibration = session_data.get('calibration')
+            calibration_source = 'session'
         
-        if calibration:
-            print(f"DEBUG_REQUEST: Calibration FOUND. Type={type(calibration)}")
-            if isinstance(calibration, dict):
-                 print(f"DEBUG_REQUEST: Calibration Keys={calibration.keys()}")
-                 if 'points' in calibration:
-                     print(f"DEBUG_REQUEST: Points Count={len(calibration['points'])}")
-        else:
-            print("DEBUG_REQUEST: Calibration FAILED. It is None.")
+        debug_trace.trace("detect_auto request: method=%s, colors=%d, calibration=%s (%s)",
+                          detection_method, len(colors), type(calibration).__name__ if calibration else None,
+                          calibration_source)
         
         # New Safety Check
         if not calibration:
@@ -150,13 +248,15 @@ def detect_auto():
         if not colors:
             return jsonify({'error': 'No colors provided'}), 400
         
-        # Extract series for each picked color
+        # Extract series for each picked color (in parallel)
+        series_timings = []
         series_list = detector.detect_auto(
             mode='guided', 
             colors=colors, 
             n_series=len(colors),
             detection_method=detection_method,
-            calibration_points=calibration  # Pass raw calibration data
+            calibration_points=calibration,  # Pass raw calibration data
+            timings=series_timings
         )
         
         # Filter and Format
@@ -167,13 +267,10 @@ def detect_auto():
                 if s and len(s['points']) > 5:
                     filtered_series.append(s)
         
-        # DEBUG: Check if ROI is in response
-        if filtered_series and 'debug_roi' in filtered_series[0]:
-            print(f"DEBUG_RESPONSE: ROI present in first series: {filtered_series[0]['debug_roi']}")
-        else:
-            print("DEBUG_RESPONSE: No ROI in response series")
+        debug_trace.trace("detect_auto response: %d series, ROI=%s", len(filtered_series),
+                          filtered_series[0].get('debug_roi') if filtered_series else None)
 
-        return jsonify({'series': filtered_series})
+        return jsonify({'series': filtered_series, 'timings': {**timer.as_dict(), 'series': series_timings}})
     
     return jsonify({'error': 'Invalid mode'}), 400
 
@@ -181,33 +278,27 @@ def detect_auto():
 def export_csv():
     data = request.json
     points = data.get('points', [])
-    calibration = session_data.get('calibration')
+    calibration = current_session().get('calibration')
     
     if not calibration:
         return jsonify({'error': 'No calibration data'}), 400
     
     # Convert pixel coordinates to data values
     cal_points = calibration['points']
-    cal_values = calibration['values']
+    x1_val, x2_val, y1_val, y2_val = calibration['values']
     
-    # Calculate conversion factors
-    x1_px, x2_px = cal_points[0][0], cal_points[1][0]
-    y1_px, y2_px = cal_points[2][1], cal_points[3][1]
-    
-    x1_val, x2_val, y1_val, y2_val = cal_values
+    calibrator = Calibrator()
+    calibrator.set_calibration(
+        [tuple(p) for p in cal_points],
+        [(x1_val, 0), (x2_val, 0), (0, y1_val), (0, y2_val)]
+    )
     
-    x_scale = (x2_val - x1_val) / (x2_px - x1_px)
-    y_scale = (y2_val - y1_val) / (y2_px - y1_px)
+    # Convert points (single vectorized pass)
+    pixels = np.array([[p['x'], p['y']] for p in points], dtype=np.float64).reshape(-1, 2)
+    graph_ids = [p.get('graph_id', 1) for p in points]
+    values = calibrator.map_to_data_many(pixels)
     
-    # Convert points
-    csv_data = []
-    for point in points:
-        px_x, px_y, graph_id = point['x'], point['y'], point.get('graph_id', 1)
-        
-        val_x = x1_val + (px_x - x1_px) * x_scale
-        val_y = y1_val + (px_y - y1_px) * y_scale
-        
-        csv_data.append([graph_id, val_x, val_y])
+    csv_data = [[gid, val_x, val_y] for gid, (val_x, val_y) in zip(graph_ids, values.tolist())]
     
     # Create CSV in memory
     output = BytesIO()
@@ -240,6 +331,8 @@ if __name__ == '__main__':
     print("🚀  AUTO PLOT DIGITIZER - VERSION V6 (UPDATED)  🚀")
     print("="*50)
     print("✅  V6 Logic Loaded: Red Exclusion, Smart ROI, Clustering")
+    if debug_trace.enabled:
+        print(f"🐞  Debug trace enabled, artifacts saved to {os.path.abspath(debug_trace.directory)}")
     
     def open_browser():
         webbrowser.open('http://localhost:8080')
@@ -250,4 +343,13 @@ if __name__ == '__main__':
     print("📱 Opening browser at http://localhost:8080")
     print("⏹️  Press Ctrl+C to stop")
     
-    app.run(debug=True, port=8080, use_reloader=False)
+    # AUTOPLOT_HOST=0.0.0.0 shares the instance on the network
+    host = os.environ.get('AUTOPLOT_HOST', '127.0.0.1')
+    try:
+        from waitress import serve
+    except ImportError:
+        # Fallback: Flask development server (threaded, no debugger)
+        print("⚠️  waitress not installed, using the Flask development server")
+        app.run(host=host, port=8080, threaded=True, use_reloader=False)
+    else:
+        serve(app, host=host, port=8080, threads=int(os.environ.get('AUTOPLOT_THREADS', 8)))
@@ -0,0 +1,89 @@
+import sys
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.auto_detector import AutoDetector
+
+def create_plot(width, height, noise=0.0):
+    """Synthetic chart: axes with ticks and labels, two curves, optional scanner noise."""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    left, right, top, bottom = int(width * 0.1), int(width * 0.95), int(height * 0.08), int(height * 0.88)
+    thickness = max(1, width // 1000)
+    cv2.line(image, (left, bottom), (right, bottom), (0, 0, 0), thickness)
+    cv2.line(image, (left, bottom), (left, top), (0, 0, 0), thickness)
+    tick = max(4, height // 100)
+    for i in range(6):
+        x = left + i * (right - left) // 5
+        y = bottom - i * (bottom - top) // 5
+        cv2.line(image, (x, bottom), (x, bottom + tick), (0, 0, 0), thickness)
+        cv2.line(image, (left - tick, y), (left, y), (0, 0, 0), thickness)
+        cv2.putText(image, str(i * 2), (x - tick, bottom + 4 * tick), cv2.FONT_HERSHEY_SIMPLEX,
+                    height / 900, (0, 0, 0), thickness)
+
+    xs = np.linspace(left, right, right - left)
+    for phase, color in ((0.0, (200, 80, 20)), (1.5, (40, 160, 40))):
+        ys = (top + bottom) / 2 + (bottom - top) * 0.3 * np.sin((xs - left) / (right - left) * 6 + phase)
+        pts = np.column_stack((xs, ys)).astype(np.int32).reshape(-1, 1, 2)
+        cv2.polylines(image, [pts], False, color, max(2, width // 640))
+
+    if noise:
+        rng = np.random.default_rng(0)
+        image = np.clip(image + rng.normal(0, noise, image.shape), 0, 255).astype(np.uint8)
+    return image, (left, bottom, right, top)
+
+def axes_error(axes, truth):
+    """Largest distance (px) between detected and true axis positions and far ends
+    (the near ends meet the tick marks at the corner)"""
+    if axes is None:
+        return None
+    left, bottom, right, top = truth
+    x1, y1, x2, y2 = axes['x_axis']
+    vx1, vy1, vx2, vy2 = axes['y_axis']
+    return max(abs(y1 - bottom), abs(max(x1, x2) - right),
+               abs(vx1 - left), abs(min(vy1, vy2) - top))
+
+def time_call(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+def run_benchmark():
+    print("--- Benchmark: axis detection ---")
+    cases = [(1000, 600, 0), (1920, 1080, 0), (3840, 2160, 0), (7680, 4320, 0), (3840, 2160, 20)]
+    tolerance = 6 # px: thick axes, tick marks at the corner
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for width, height, noise in cases:
+            image, truth = create_plot(width, height, noise)
+            path = os.path.join(tmp, 'plot.png')
+            cv2.imwrite(path, image)
+            detector = AutoDetector(path)
+
+            new_axes, new_ms = time_call(detector._detect_axes_by_projection)
+            old_axes, old_ms = time_call(detector._detect_axes_by_hough, repeat=1) # Includes Canny on first use
+            new_err, old_err = axes_error(new_axes, truth), axes_error(old_axes, truth)
+            ok = new_err is not None and new_err <= tolerance
+            all_ok = all_ok and ok
+            print(f"{width}x{height} noise={noise:2d} hough={old_ms:8.1f}ms (err {old_err}) "
+                  f"projection={new_ms:6.1f}ms (err {new_err}) {'OK' if ok else 'MISSED'}")
+
+        # Cached on the instance: detect_multiple_series reuses the first result
+        _, first_ms = time_call(detector.detect_axes, repeat=1)
+        _, cached_ms = time_call(detector.detect_axes)
+        print(f"detect_axes first call {first_ms:.1f}ms, cached {cached_ms:.3f}ms")
+
+    if all_ok:
+        print("PASS: Projection axes within tolerance at every size")
+    else:
+        print("FAIL: Projection axis detection missed an axis")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,123 @@
+import sys
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.auto_detector import AutoDetector
+
+def legacy_cluster_boxes(boxes, dist_threshold):
+    """Previous implementation: rescan every pair of groups after each single merge."""
+    for i, b in enumerate(boxes):
+        b['group_id'] = i
+
+    changed = True
+    while changed:
+        changed = False
+        groups = {}
+        for b in boxes:
+            groups.setdefault(b['group_id'], []).append(b)
+
+        group_ids = list(groups.keys())
+        for i in range(len(group_ids)):
+            for j in range(i + 1, len(group_ids)):
+                gid1, gid2 = group_ids[i], group_ids[j]
+                has_close = False
+                for b1 in groups[gid1]:
+                    for b2 in groups[gid2]:
+                        dx = max(0, abs(b1['center'][0] - b2['center'][0]) - (b1['w'] + b2['w'])/2)
+                        dy = max(0, abs(b1['center'][1] - b2['center'][1]) - (b1['h'] + b2['h'])/2)
+                        if np.sqrt(dx*dx + dy*dy) < dist_threshold:
+                            has_close = True
+                            break
+                    if has_close: break
+                if has_close:
+                    for b in groups[gid2]:
+                        b['group_id'] = gid1
+                    changed = True
+                    break
+            if changed: break
+
+    groups = {}
+    for b in boxes:
+        groups.setdefault(b['group_id'], []).append(b)
+    return list(groups.values())
+
+def create_dashed_mask(width, height, num_curves, dash, gap):
+    """Synthetic data mask: num_curves dashed sine curves, so the box count grows with density."""
+    mask = np.zeros((height, width), dtype=np.uint8)
+    xs = np.arange(int(width * 0.05), int(width * 0.95))
+    for c in range(num_curves):
+        offset = height * (c + 1) / (num_curves + 1)
+        ys = (offset + height * 0.4 / (num_curves + 1) * np.sin(xs / width * 8 + c)).astype(np.int32)
+        for i in range(0, len(xs) - dash + 1, dash + gap):
+            pts = np.column_stack((xs[i:i + dash], ys[i:i + dash])).reshape(-1, 1, 2)
+            cv2.polylines(mask, [pts], False, 255, 2)
+    return mask
+
+def mask_to_boxes(mask):
+    """Same box construction as AutoDetector._detect_series_by_clustering."""
+    kernel = np.ones((2, 2), np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = []
+    for i, cnt in enumerate(contours):
+        if cv2.contourArea(cnt) < 5: continue
+        x, y, w, h = cv2.boundingRect(cnt)
+        boxes.append({'id': i, 'rect': (x, y, w, h), 'w': w, 'h': h,
+                      'contour': cnt, 'center': (x + w/2, y + h/2)})
+    return boxes
+
+def grouping(groups):
+    return [[b['id'] for b in g] for g in groups]
+
+def time_call(func, *args, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+def run_benchmark():
+    print("--- Benchmark: series clustering ---")
+    # (curves, dash, gap): denser plots produce more, smaller boxes
+    densities = [(1, 20, 10), (2, 12, 6), (1, 6, 4), (2, 6, 4), (4, 8, 5), (6, 5, 4), (10, 4, 4)]
+    legacy_max_boxes = 400 # The legacy loop is roughly cubic once dashes merge; skip it beyond this
+
+    all_match = True
+    for curves, dash, gap in densities:
+        mask = create_dashed_mask(1920, 1080, curves, dash, gap)
+        boxes = mask_to_boxes(mask)
+        new_groups, new_ms = time_call(AutoDetector._cluster_boxes, boxes, 4.0)
+
+        if len(boxes) <= legacy_max_boxes:
+            old_groups, old_ms = time_call(legacy_cluster_boxes, boxes, 4.0, repeat=1)
+            match = grouping(old_groups) == grouping(new_groups)
+            all_match = all_match and match
+            print(f"curves={curves:2d} dash={dash:2d} gap={gap:2d} boxes={len(boxes):5d} groups={len(new_groups):4d} "
+                  f"legacy={old_ms:9.2f}ms new={new_ms:7.2f}ms speedup={old_ms / max(new_ms, 1e-6):7.1f}x "
+                  f"{'OK' if match else 'MISMATCH'}")
+        else:
+            print(f"curves={curves:2d} dash={dash:2d} gap={gap:2d} boxes={len(boxes):5d} groups={len(new_groups):4d} "
+                  f"legacy=  skipped new={new_ms:7.2f}ms")
+
+    # End to end: same series from the whole clustering step
+    mask = create_dashed_mask(800, 600, 2, 12, 6)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'plot.png')
+        cv2.imwrite(path, cv2.cvtColor(255 - mask, cv2.COLOR_GRAY2BGR))
+        detector = AutoDetector(path)
+    series, total_ms = time_call(detector._detect_series_by_clustering, mask)
+    print(f"_detect_series_by_clustering 800x600: {total_ms:.2f}ms, "
+          f"{[(s['label'], s['count']) for s in series]}")
+
+    if all_match:
+        print("PASS: Union-find clustering matches legacy grouping at every density")
+    else:
+        print("FAIL: Grouping mismatch against legacy loop")
+
+if __name__ == "__main__":
+    run_benchmark()
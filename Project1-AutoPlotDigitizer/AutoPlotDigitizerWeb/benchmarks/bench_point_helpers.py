@@ -0,0 +1,114 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.auto_detector import AutoDetector
+
+# Previous implementations: Python loops over lists of point tuples
+
+def legacy_extract_points_from_mask(mask):
+    y_indices, x_indices = np.nonzero(mask)
+    points = []
+    step = 1
+    if len(x_indices) > 5000: step = 2
+    for i in range(0, len(x_indices), step):
+        points.append((int(x_indices[i]), int(y_indices[i])))
+    points.sort(key=lambda p: p[0])
+    return points
+
+def legacy_filter_points_in_plot_area(points, plot_area):
+    valid_points = []
+    for (x, y) in points:
+        if (plot_area['x_min'] <= x <= plot_area['x_max'] and
+            plot_area['y_min'] <= y <= plot_area['y_max']):
+            valid_points.append((x, y))
+    return valid_points
+
+def legacy_detect_line_style(points):
+    if len(points) < 10:
+        return 'solid'
+    gaps = []
+    for i in range(len(points) - 1):
+        x1, y1 = points[i]
+        x2, y2 = points[i + 1]
+        gaps.append(np.sqrt((x2 - x1)**2 + (y2 - y1)**2))
+    gaps = np.array(gaps)
+    large_gaps = gaps[gaps > 10]
+    if len(large_gaps) > len(gaps) * 0.3 and len(large_gaps) > 5:
+        if np.std(large_gaps) < np.mean(large_gaps) * 0.5:
+            return 'dashed'
+    return 'solid'
+
+def legacy_validate_series(points, width):
+    if len(points) < 50:
+        return False
+    x_coords = [p[0] for p in points]
+    if max(x_coords) - min(x_coords) < width * 0.3:
+        return False
+    sorted_points = sorted(points, key=lambda p: p[0])
+    x_gaps = []
+    for i in range(len(sorted_points) - 1):
+        gap = sorted_points[i+1][0] - sorted_points[i][0]
+        if gap > 0:
+            x_gaps.append(gap)
+    if x_gaps:
+        avg_gap = sum(x_gaps) / len(x_gaps)
+        if max(x_gaps) > avg_gap * 10 and max(x_gaps) > 50:
+            return False
+    return True
+
+def create_curve_mask(width, height, thickness):
+    """Thick sine curve mask, like a solid series at high resolution"""
+    mask = np.zeros((height, width), dtype=np.uint8)
+    xs = np.arange(width)
+    ys = (height / 2 + height / 3 * np.sin(xs / width * 10)).astype(np.int64)
+    for dy in range(-(thickness // 2), thickness - thickness // 2):
+        mask[np.clip(ys + dy, 0, height - 1), xs] = 255
+    return mask
+
+def time_call(func, *args, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+def run_benchmark():
+    print("--- Benchmark: AutoDetector point helpers ---")
+    detector = AutoDetector.__new__(AutoDetector) # Helpers only need the image width
+    all_match = True
+
+    for width, height, thickness in [(1000, 600, 3), (1920, 1080, 4), (3840, 2160, 8), (7680, 4320, 12)]:
+        detector.width = width
+        mask = create_curve_mask(width, height, thickness)
+        plot_area = {'x_min': width * 0.1, 'x_max': width * 0.9, 'y_min': height * 0.1, 'y_max': height * 0.9}
+
+        old_pts, old_extract = time_call(legacy_extract_points_from_mask, mask)
+        new_pts, new_extract = time_call(detector._extract_points_from_mask, mask)
+        old_in, old_filter = time_call(legacy_filter_points_in_plot_area, old_pts, plot_area)
+        new_in, new_filter = time_call(detector._filter_points_in_plot_area, new_pts, plot_area)
+        old_style, old_style_ms = time_call(legacy_detect_line_style, old_in)
+        new_style, new_style_ms = time_call(detector._detect_line_style, new_in)
+        old_valid, old_valid_ms = time_call(legacy_validate_series, old_in, width)
+        new_valid, new_valid_ms = time_call(detector._validate_series, {'points': new_in})
+
+        match = ([tuple(p) for p in new_in.tolist()] == old_in and old_style == new_style
+                 and old_valid == new_valid)
+        all_match = all_match and match
+        old_total = old_extract + old_filter + old_style_ms + old_valid_ms
+        new_total = new_extract + new_filter + new_style_ms + new_valid_ms
+        print(f"{width}x{height} points={len(old_pts):7d} extract {old_extract:8.1f} -> {new_extract:6.1f}ms "
+              f"filter {old_filter:7.1f} -> {new_filter:5.1f}ms style {old_style_ms:7.1f} -> {new_style_ms:5.1f}ms "
+              f"validate {old_valid_ms:7.1f} -> {new_valid_ms:5.1f}ms total speedup={old_total / max(new_total, 1e-6):5.1f}x "
+              f"{'OK' if match else 'MISMATCH'}")
+
+    if all_match:
+        print("PASS: Vectorized helpers match the legacy loops")
+    else:
+        print("FAIL: Vectorized helpers differ from the legacy loops")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,17 +1,49 @@
 import cv2
 import numpy as np
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from typing import Tuple, List, Optional, Any
 
+from .debug_trace import DebugTrace
+from .stage_timer import stage, timed
+
 class AutoDetector:
     """Automatic detection of axes and data curves in graph images"""
     
-    def __init__(self, image_path: str, calibration_points: Optional[dict] = None):
+    def __init__(self, image_path: str, calibration_points: Optional[dict] = None, debug: Optional[DebugTrace] = None):
         self.image_path = image_path
+        self.debug = debug or DebugTrace() # Disabled unless a trace directory is configured
         self.image = cv2.imread(image_path)
         self.gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
         self.height, self.width = self.gray.shape
         self.calibration_points = calibration_points
         self.plot_area = self._calculate_plot_area_from_calibration(calibration_points) if calibration_points else None
+        
+        # Derived data computed on first use and kept, so a cached detector
+        # (see DetectorCache) skips the preprocessing on repeated detections
+        self._hsv = None
+        self._edges = None
+        self._axes = None
+        self._axes_detected = False
+    
+    @property
+    def hsv(self) -> np.ndarray:
+        """HSV version of the image"""
+        if self._hsv is None:
+            with stage('hsv'):
+                self._hsv = cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV)
+        return self._hsv
+    
+    @property
+    def edges(self) -> np.ndarray:
+        """Canny edges of the grayscale image (input of the axis Hough transform)"""
+        if self._edges is None:
+            # Edge detection - relaxed thresholds for better detection
+            with stage('canny'):
+                self._edges = cv2.Canny(self.gray, 30, 100, apertureSize=3)
+        return self._edges
     
     def _sample_color_at_click(self, x: int, y: int, radius: int = 2) -> Tuple[int, int, int]:
         """Extract actual color at click position by sampling nearby pixels"""
@@ -71,7 +103,7 @@ class AutoDetector:
     def _calculate_plot_area_from_calibration(self, calibration_data: Any) -> Optional[dict]:
         """Calculate plot area boundaries from calibration data (dict or list) - Robust Version"""
         if not calibration_data:
-            print("DEBUG: Calibration data is empty")
+            self.debug.trace("Calibration data is empty")
             return None
         
         try:
@@ -131,10 +163,10 @@ class AutoDetector:
                      except: pass
 
             if not points or len(points) < 2:
-                print(f"DEBUG: Could not extract valid points from: {calibration_data}")
+                self.debug.trace("Could not extract valid points from: %s", calibration_data)
                 return None
             
-            print(f"DEBUG: Successfully extracted {len(points)} points: {points}")
+            self.debug.trace("Successfully extracted %d points: %s", len(points), points)
                 
             # Calculate Bounding Box
             x_coords = [p[0] for p in points]
@@ -147,7 +179,7 @@ class AutoDetector:
             
             # Valid plot area?
             if x_max <= x_min or y_max <= y_min:
-                print(f"DEBUG: Invalid area dimensions: {x_min}-{x_max}, {y_min}-{y_max}")
+                self.debug.trace("Invalid area dimensions: %s-%s, %s-%s", x_min, x_max, y_min, y_max)
                 return None
 
             # Add Margin
@@ -158,39 +190,148 @@ class AutoDetector:
                 'y_min': max(0, y_min - margin),
                 'y_max': min(self.height, y_max + margin) 
             }
-            print(f"DEBUG: Calculated Plot Area: {plot_area}")
+            self.debug.trace("Calculated Plot Area: %s", plot_area)
             return plot_area
             
         except Exception as e:
-            print(f"Error calculating plot area: {e}")
-            import traceback
-            traceback.print_exc()
+            self.debug.logger.exception(f"Error calculating plot area: {e}")
             return None
     
-    def _filter_points_in_plot_area(self, points: List[Tuple[int, int]], plot_area: Optional[dict]) -> List[Tuple[int, int]]:
-        """Filter points to only include those inside the plot area"""
+    def _filter_points_in_plot_area(self, points: np.ndarray, plot_area: Optional[dict]) -> np.ndarray:
+        """Filter (N, 2) points to only include those inside the plot area"""
+        points = np.asarray(points).reshape(-1, 2)
         if not plot_area:
             return points  # No filtering if plot area not defined
         
-        valid_points = []
-        for (x, y) in points:
-            if (plot_area['x_min'] <= x <= plot_area['x_max'] and
-                plot_area['y_min'] <= y <= plot_area['y_max']):
-                valid_points.append((x, y))
-        
-        return valid_points
+        x, y = points[:, 0], points[:, 1]
+        inside = ((x >= plot_area['x_min']) & (x <= plot_area['x_max']) &
+                  (y >= plot_area['y_min']) & (y <= plot_area['y_max']))
+        return points[inside]
         
     def detect_axes(self) -> Optional[dict]:
         """
-        Detect X and Y axes using Hough Line Transform
-        Returns: dict with 'x_axis' and 'y_axis' line coordinates
+        Detect X and Y axes: coarse-to-fine projection profiles, with the Hough Line
+        Transform as fallback for tilted or broken axes
+        Returns: dict with 'x_axis' and 'y_axis' line coordinates (computed once per detector)
+        """
+        if not self._axes_detected:
+            self._axes = self._detect_axes_uncached()
+            self._axes_detected = True
+        return dict(self._axes) if self._axes else None
+    
+    def _detect_axes_uncached(self) -> Optional[dict]:
+        axes = self._detect_axes_by_projection()
+        if axes is None:
+            self.debug.trace("Axis projection found no axis-aligned axes, falling back to Hough")
+            axes = self._detect_axes_by_hough()
+        return axes
+    
+    def _detect_axes_by_projection(self) -> Optional[dict]:
+        """
+        Finds long horizontal and vertical lines in the row and column profiles of a
+        downscaled binary image, then refines each one in a narrow full resolution band.
+        Same selection as the Hough path: longest line (ties: bottom-most horizontal,
+        left-most vertical), at least width/5 long, gaps up to 20px, not within 15px of the border.
+        Only finds (near) axis-aligned lines.
         """
-        # Edge detection - relaxed thresholds for better detection
-        edges = cv2.Canny(self.gray, 30, 100, apertureSize=3)
+        with stage('axis_projection'):
+            ink = self.gray
+            if np.median(ink[::8, ::8]) < 128:
+                ink = cv2.bitwise_not(ink) # Dark background: the lines are the light pixels
+            
+            # Downscale by an integer factor keeping the darkest pixel of each block,
+            # so thin lines survive; the threshold is chosen on the small image
+            factor = max(1, int(np.ceil(max(self.width, self.height) / 500)))
+            small_h, small_w = self.height // factor, self.width // factor
+            small = ink
+            if factor > 1:
+                block = np.ones((factor, factor), np.uint8)
+                small = cv2.erode(ink[:small_h * factor, :small_w * factor], block, anchor=(0, 0))[::factor, ::factor]
+            threshold, _ = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+            small = small <= threshold
+            
+            min_length = self.width // 5
+            # Lines run along axis 1: rows as they are for the x axis, transposed for the y axis
+            x_axis = self._find_axis_line(small, ink, threshold, factor, min_length, prefer_last=True)
+            y_axis = self._find_axis_line(small.T, ink.T, threshold, factor, min_length, prefer_last=False)
+        
+        if x_axis is None or y_axis is None:
+            return None
+        
+        y, x_start, x_end = x_axis
+        x, y_start, y_end = y_axis
+        return {
+            'x_axis': (x_start, y, x_end, y),
+            'y_axis': (x, y_end, x, y_start)
+        }
+    
+    @staticmethod
+    def _find_axis_line(small: np.ndarray, ink: np.ndarray, threshold: float, factor: int, min_length: int,
+                        prefer_last: bool, max_gap: int = 20, margin: int = 15) -> Optional[Tuple[int, int, int]]:
+        """
+        Longest line running along axis 1 of the grayscale `ink` image (dark lines), given
+        its binary `small` copy downscaled by `factor`. Ties go to the last row when
+        prefer_last, else the first. Returns (row, first, last) in full resolution pixels, or None.
+        """
+        # Coarse: longest run per row of the small image
+        rows, starts, ends = AutoDetector._line_runs(small, int(np.ceil(max_gap / factor)))
+        profile = np.zeros(small.shape[0], dtype=np.int64)
+        np.maximum.at(profile, rows, ends - starts)
+        
+        n_rows = ink.shape[0]
+        centers = (np.arange(len(profile)) + 0.5) * factor
+        profile[(centers <= margin) | (centers >= n_rows - margin)] = 0
+        if profile.max() < min_length // factor - 1:
+            return None
+        
+        # Rows within the downscaling error of the longest compete on position
+        candidates = np.flatnonzero(profile >= profile.max() - 2)
+        row = candidates[-1] if prefer_last else candidates[0]
+        
+        # Fine: exact row and extent in the full resolution band covered by that row
+        lo = max(margin + 1, row * factor - 2)
+        hi = min(n_rows - margin, (row + 1) * factor + 2)
+        if hi <= lo:
+            return None
+        rows, starts, ends = AutoDetector._line_runs(ink[lo:hi] <= threshold, max_gap)
+        lengths = ends - starts
+        if len(lengths) == 0 or lengths.max() < min_length:
+            return None
+        best = np.lexsort((rows if prefer_last else -rows, lengths))[-1]
+        return int(lo + rows[best]), int(starts[best]), int(ends[best]) - 1
+    
+    @staticmethod
+    def _line_runs(binary: np.ndarray, max_gap: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Runs of set pixels along each row of a boolean image, joining runs separated by
+        at most max_gap pixels. Lines less than half covered by set pixels are dropped.
+        Returns (row, start, end) arrays, end exclusive.
+        """
+        padded = np.zeros((binary.shape[0], binary.shape[1] + 2), dtype=bool)
+        padded[:, 1:-1] = binary
+        # Transitions alternate start/end within each row
+        rows, cols = np.nonzero(padded[:, 1:] != padded[:, :-1])
+        rows, starts, ends = rows[::2], cols[::2], cols[1::2]
+        if len(starts) == 0:
+            return rows, starts, ends
+        
+        joins = (rows[1:] == rows[:-1]) & (starts[1:] - ends[:-1] <= max_gap)
+        first = np.concatenate(([True], ~joins)) # Run opens a new line
+        last = np.concatenate((~joins, [True])) # Run closes its line
+        rows, starts, ends = rows[first], starts[first], ends[last]
+        
+        # Mostly-gap lines are rows of text or scattered marks rather than drawn lines
+        ink = np.add.reduceat(cols[1::2] - cols[::2], np.flatnonzero(first))
+        solid = ink * 2 >= ends - starts
+        return rows[solid], starts[solid], ends[solid]
+    
+    def _detect_axes_by_hough(self) -> Optional[dict]:
+        edges = self.edges
         
         # Hough Line Transform - lowered threshold and increased gap tolerance
-        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=80, 
-                                minLineLength=self.width//5, maxLineGap=20)
+        with stage('hough'):
+            lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=80, 
+                                    minLineLength=self.width//5, maxLineGap=20)
         
         if lines is None:
             return None
@@ -201,8 +342,8 @@ class AutoDetector:
         
         margin = 15 # Ignore lines within 15px of border
         
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
+        # (N, 1, 4) in OpenCV 4, (N, 4) in OpenCV 5
+        for x1, y1, x2, y2 in lines.reshape(-1, 4):
             angle = np.abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
             length = np.sqrt((x2-x1)**2 + (y2-y1)**2)
             
@@ -324,12 +465,16 @@ class AutoDetector:
         
         return vis
     
-    def detect_auto(self, mode: str = 'guided', colors: List[List[int]] = [], n_series: int = 1, detection_method: str = 'color', calibration_points: Optional[dict] = None) -> List[dict]:
+    def detect_auto(self, mode: str = 'guided', colors: List[List[int]] = [], n_series: int = 1, detection_method: str = 'color', calibration_points: Optional[dict] = None,
+                    timings: Optional[list] = None) -> List[dict]:
         """
         Main entry point for auto-detection called by app.py
         Handles Guided Mode (Color-based) and Automatic Mode (Clustering)
+        In guided mode the colors are extracted in parallel (OpenCV releases the GIL);
+        if a timings list is given, one {'label', 'color', 'seconds'} entry per color is appended to it.
+        Stage timings go to the active StageTimer (see core.stage_timer), including those of the workers.
         """
-        print(f"DEBUG: detect_auto called with mode={mode}, method={detection_method}")
+        self.debug.trace("detect_auto called with mode=%s, method=%s", mode, detection_method)
         
         # 1. Automatic Mode (Legacy / No Colors)
         if mode == 'auto' or not colors:
@@ -342,24 +487,40 @@ class AutoDetector:
         plot_area = None
         if calibration_points:
             plot_area = self._calculate_plot_area_from_calibration(calibration_points)
-            print(f"DEBUG: detect_auto using plot_area: {plot_area}")
+            self.debug.trace("detect_auto using plot_area: %s", plot_area)
         else:
-            print("DEBUG: detect_auto called WITHOUT calibration_points")
+            self.debug.trace("detect_auto called WITHOUT calibration_points")
             
-        for i, color in enumerate(colors):
+        def extract(i, color):
             label = f"Graph {i+1}"
+            start = time.perf_counter()
+            extracted = []
             
             if detection_method == 'color' or detection_method == 'both':
                 # V7 Logic returns a LIST of series (Solid + Dashed)
-                extracted = self._extract_series_by_color(tuple(color), label, plot_area=plot_area)
-                if extracted:
-                    series_results.extend(extracted)
+                extracted = self._extract_series_by_color(tuple(color), label, plot_area=plot_area) or []
                     
             elif detection_method == 'style':
                 # Legacy Style extraction (single dict)
-                extracted = self._extract_series_by_style(tuple(color), label)
-                if extracted:
-                    series_results.append(extracted)
+                single = self._extract_series_by_style(tuple(color), label)
+                extracted = [single] if single else []
+            
+            timing = {'label': label, 'color': [int(c) for c in color], 'seconds': time.perf_counter() - start}
+            return extracted, timing
+        
+        # Shared read-only planes are computed once, before the workers start
+        _ = self.hsv
+        
+        workers = max(1, min(len(colors), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map() yields in submission order, so results merge in color order.
+            # Each task runs in a copy of this context so stages reach the request's StageTimer.
+            contexts = [copy_context() for _ in colors]
+            for extracted, timing in executor.map(lambda ctx, i, color: ctx.run(extract, i, color),
+                                                  contexts, range(len(colors)), colors):
+                series_results.extend(extracted)
+                if timings is not None:
+                    timings.append(timing)
                     
         return series_results
 
@@ -417,41 +578,44 @@ class AutoDetector:
         return mask
 
     def _get_data_mask_refined(self, plot_mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        hsv = cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV)
+        hsv = self.hsv
         
-        # 1. Background Exclude
-        lower_bg = np.array([0, 0, 200])
-        upper_bg = np.array([180, 50, 255])
-        bg_mask = cv2.inRange(hsv, lower_bg, upper_bg)
+        with stage('inrange'):
+            # 1. Background Exclude
+            lower_bg = np.array([0, 0, 200])
+            upper_bg = np.array([180, 50, 255])
+            bg_mask = cv2.inRange(hsv, lower_bg, upper_bg)
         
-        # 2. Red Color (Text) Exclude
-        lower_red1 = np.array([0, 70, 50])
-        upper_red1 = np.array([10, 255, 255])
-        mask_red1 = cv2.inRange(hsv, lower_red1, upper_red1)
+            # 2. Red Color (Text) Exclude
+            lower_red1 = np.array([0, 70, 50])
+            upper_red1 = np.array([10, 255, 255])
+            mask_red1 = cv2.inRange(hsv, lower_red1, upper_red1)
         
-        lower_red2 = np.array([170, 70, 50])
-        upper_red2 = np.array([180, 255, 255])
-        mask_red2 = cv2.inRange(hsv, lower_red2, upper_red2)
+            lower_red2 = np.array([170, 70, 50])
+            upper_red2 = np.array([180, 255, 255])
+            mask_red2 = cv2.inRange(hsv, lower_red2, upper_red2)
         
-        red_mask = cv2.bitwise_or(mask_red1, mask_red2)
+            red_mask = cv2.bitwise_or(mask_red1, mask_red2)
         
-        # Combine exclusions
-        exclude_mask = cv2.bitwise_or(bg_mask, red_mask)
-        data_mask = cv2.bitwise_not(exclude_mask)
+            # Combine exclusions
+            exclude_mask = cv2.bitwise_or(bg_mask, red_mask)
+            data_mask = cv2.bitwise_not(exclude_mask)
         
-        # Apply ROI
-        if plot_mask is not None:
-            data_mask = cv2.bitwise_and(data_mask, plot_mask)
+            # Apply ROI
+            if plot_mask is not None:
+                data_mask = cv2.bitwise_and(data_mask, plot_mask)
             
         return data_mask, red_mask
 
     def _detect_series_by_clustering(self, mask: np.ndarray) -> List[dict]:
         # 1. Close small gaps
         kernel = np.ones((2, 2), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
+        with stage('morphology'):
+            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
         
         # 2. Find Contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        with stage('contours'):
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
         boxes = []
         for i, cnt in enumerate(contours):
@@ -462,60 +626,21 @@ class AutoDetector:
                 'rect': (x, y, w, h),
                 'w': w, 'h': h,
                 'contour': cnt,
-                'center': (x + w/2, y + h/2),
-                'group_id': i 
+                'center': (x + w/2, y + h/2)
             })
             
         # 3. Cluster by Proximity
         dist_threshold = 4.0 
-        
-        changed = True
-        while changed:
-            changed = False
-            groups = {}
-            for b in boxes:
-                gid = b['group_id']
-                if gid not in groups: groups[gid] = []
-                groups[gid].append(b)
-                
-            group_ids = list(groups.keys())
-            for i in range(len(group_ids)):
-                for j in range(i+1, len(group_ids)):
-                    gid1 = group_ids[i]
-                    gid2 = group_ids[j]
-                    
-                    has_close = False
-                    for b1 in groups[gid1]:
-                        for b2 in groups[gid2]:
-                            dx = max(0, abs(b1['center'][0] - b2['center'][0]) - (b1['w'] + b2['w'])/2)
-                            dy = max(0, abs(b1['center'][1] - b2['center'][1]) - (b1['h'] + b2['h'])/2)
-                            dist = np.sqrt(dx*dx + dy*dy)
-                            if dist < dist_threshold:
-                                has_close = True
-                                break
-                        if has_close: break
-                    
-                    if has_close:
-                        for b in groups[gid2]:
-                            b['group_id'] = gid1
-                        changed = True
-                        break
-                if changed: break
-                
-        # 4. Classify and Extract
-        groups = {}
-        for b in boxes:
-            gid = b['group_id']
-            if gid not in groups: groups[gid] = []
-            groups[gid].append(b)
+        groups = self._cluster_boxes(boxes, dist_threshold)
             
         series_list = []
         
-        # Collect solid and dashed points
-        solid_points = []
-        dashed_points = []
+        # Fill every kept box into one label image (label = contour index + 1) so the
+        # centerlines of all boxes come from a single pass instead of one mask per contour
+        labels = np.zeros(mask.shape, dtype=np.int32)
+        label_style = np.zeros(len(contours) + 1, dtype=np.uint8) # 0 = not kept, 1 = solid, 2 = dashed
         
-        for gid, group_boxes in groups.items():
+        for group_boxes in groups:
             min_x = min(b['rect'][0] for b in group_boxes)
             max_x = max(b['rect'][0] + b['rect'][2] for b in group_boxes)
             total_width = max_x - min_x
@@ -530,13 +655,18 @@ class AutoDetector:
             
             is_solid = total_width > 30
             
-            target_list = solid_points if is_solid else dashed_points
-            
             for b in group_boxes:
-                mask_b = np.zeros(mask.shape, dtype=np.uint8)
-                cv2.drawContours(mask_b, [b['contour']], -1, 255, -1)
-                pts = self._extract_points_from_mask_internal(mask_b)
-                target_list.extend(pts)
+                label_style[b['id'] + 1] = 1 if is_solid else 2
+        
+        # Collect solid and dashed points
+        with stage('point_extraction'):
+            for b in boxes:
+                if label_style[b['id'] + 1]:
+                    cv2.drawContours(labels, [b['contour']], -1, b['id'] + 1, -1)
+            point_labels, xs, ys = self._column_centerlines(labels)
+            style = label_style[point_labels]
+            solid_points = list(zip(xs[style == 1].tolist(), ys[style == 1].tolist()))
+            dashed_points = list(zip(xs[style == 2].tolist(), ys[style == 2].tolist()))
         
         # Sort and Create Series Dicts
         if solid_points:
@@ -561,22 +691,69 @@ class AutoDetector:
             
         return series_list
 
-    def _extract_points_from_mask_internal(self, mask: np.ndarray) -> List[Tuple[int, int]]:
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours: return []
-        mask_filled = np.zeros_like(mask)
-        cv2.drawContours(mask_filled, contours, -1, 255, -1)
-        y_coords, x_coords = np.where(mask_filled > 0)
-        x_to_y = {}
-        for x, y in zip(x_coords, y_coords):
-            if x not in x_to_y: x_to_y[x] = []
-            x_to_y[x].append(y)
-        points = []
-        for x in sorted(x_to_y.keys()):
-            ys = x_to_y[x]
-            mean_y = int(round(sum(ys) / len(ys)))
-            points.append((x, mean_y))
-        return points
+    @staticmethod
+    @timed('clustering')
+    def _cluster_boxes(boxes: List[dict], dist_threshold: float) -> List[List[dict]]:
+        """
+        Groups boxes whose gap (distance between rectangles) is below dist_threshold,
+        transitively. Boxes are bucketed in a grid so only nearby pairs are compared,
+        and merged with union-find: near-linear instead of re-scanning all group pairs
+        after every merge. Groups are returned in order of their first box, boxes in input order.
+        """
+        parent = list(range(len(boxes)))
+        
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]  # Path halving
+                i = parent[i]
+            return i
+        
+        # Boxes closer than the threshold have rects grown by threshold/2 that overlap,
+        # so they share at least one grid cell
+        cell = 32
+        half = dist_threshold / 2
+        buckets = {}
+        for idx, b in enumerate(boxes):
+            x, y, w, h = b['rect']
+            for cx in range(int((x - half) // cell), int((x + w + half) // cell) + 1):
+                for cy in range(int((y - half) // cell), int((y + h + half) // cell) + 1):
+                    buckets.setdefault((cx, cy), []).append(idx)
+        
+        for members in buckets.values():
+            for i_pos, i in enumerate(members):
+                b1 = boxes[i]
+                for j in members[i_pos + 1:]:
+                    root_i, root_j = find(i), find(j)
+                    if root_i == root_j:
+                        continue
+                    b2 = boxes[j]
+                    dx = max(0, abs(b1['center'][0] - b2['center'][0]) - (b1['w'] + b2['w'])/2)
+                    dy = max(0, abs(b1['center'][1] - b2['center'][1]) - (b1['h'] + b2['h'])/2)
+                    if np.sqrt(dx*dx + dy*dy) < dist_threshold:
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+        
+        groups = {}
+        for idx, b in enumerate(boxes):
+            groups.setdefault(find(idx), []).append(b)
+        return list(groups.values())
+
+    @staticmethod
+    def _column_centerlines(labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Mean row of every (label, column) pair in a label image (0 = background),
+        rounded half to even like round(). Sums and counts come from one np.bincount
+        over all pixels. Returns (label, x, y) arrays ordered by label, then x.
+        """
+        ys, xs = np.nonzero(labels)
+        if len(xs) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        width = labels.shape[1]
+        keys = labels[ys, xs].astype(np.int64) * width + xs
+        keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        sums = np.bincount(inverse.ravel(), weights=ys, minlength=len(keys))
+        mean_y = np.round(sums / counts).astype(np.int64)
+        return keys // width, keys % width, mean_y
     
     def _extract_series_by_color(self, target_color: Tuple[int, int, int], label: str, plot_area: Optional[dict] = None) -> List[dict]:
         """
@@ -591,10 +768,18 @@ class AutoDetector:
             target_bgr = np.uint8([[list(target_color)]])
             target_hsv = cv2.cvtColor(target_bgr, cv2.COLOR_BGR2HSV)[0][0]
             
-            try:
-                hsv_image = cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV)
-            except Exception:
-                hsv_image = self.image
+            # Work only on the plot area when known. A few pixels of padding let the
+            # small open/close kernels below see the zeros outside the ROI, as on the full image.
+            # The crop origin is kept even so half-pixel centerline means round the same way.
+            image, hsv_image, x0, y0 = self.image, self.hsv, 0, 0
+            if plot_area is not None:
+                pad = 4
+                x0 = max(0, int(plot_area['x_min']) - pad) & ~1
+                y0 = max(0, int(plot_area['y_min']) - pad) & ~1
+                x1 = min(self.width, int(plot_area['x_max']) + pad)
+                y1 = min(self.height, int(plot_area['y_max']) + pad)
+                image = self.image[y0:y1, x0:x1]
+                hsv_image = self.hsv[y0:y1, x0:x1]
             
             h, s, v = int(target_hsv[0]), int(target_hsv[1]), int(target_hsv[2])
             
@@ -623,7 +808,8 @@ class AutoDetector:
                 min(255, v + v_tolerance)
             ], dtype=np.uint8)
             
-            mask = cv2.inRange(hsv_image, lower_hsv, upper_hsv)
+            with stage('inrange'):
+                mask = cv2.inRange(hsv_image, lower_hsv, upper_hsv)
             
             # Fallback BGR (Weighted less or intersection?)
             # BGR mask can sometimes include blacks if tolerance is high. 
@@ -637,25 +823,27 @@ class AutoDetector:
                 bgr_tolerance = 60
                 lower_bgr = np.array([max(0, c - bgr_tolerance) for c in target_color], dtype=np.uint8)
                 upper_bgr = np.array([min(255, c + bgr_tolerance) for c in target_color], dtype=np.uint8)
-                bgr_mask = cv2.inRange(self.image, lower_bgr, upper_bgr)
-                combined_mask = cv2.bitwise_or(mask, bgr_mask)
+                with stage('inrange'):
+                    bgr_mask = cv2.inRange(image, lower_bgr, upper_bgr)
+                    combined_mask = cv2.bitwise_or(mask, bgr_mask)
             
-            print(f"DEBUG: Initial Color Mask count: {cv2.countNonZero(combined_mask)}")
+            if self.debug.enabled:
+                self.debug.trace("%s: initial color mask count: %d", label, cv2.countNonZero(combined_mask))
             
             # Apply ROI Masking IF AVAILABLE, otherwise use heuristics
             roi_rect = None
             if plot_area is not None:
                 # Convert plot_area dict to mask
                 roi_mask = np.zeros_like(combined_mask)
-                roi_mask[int(plot_area['y_min']):int(plot_area['y_max']), 
-                         int(plot_area['x_min']):int(plot_area['x_max'])] = 255
+                roi_mask[int(plot_area['y_min']) - y0:int(plot_area['y_max']) - y0, 
+                         int(plot_area['x_min']) - x0:int(plot_area['x_max']) - x0] = 255
                 
-                print(f"DEBUG: ROI MASK Created: {plot_area}")
                 combined_mask = cv2.bitwise_and(combined_mask, roi_mask)
                 roi_rect = plot_area 
-                print(f"DEBUG: After ROI Mask count: {cv2.countNonZero(combined_mask)}")
+                if self.debug.enabled:
+                    self.debug.trace("%s: after ROI mask %s count: %d", label, plot_area, cv2.countNonZero(combined_mask))
             else:
-                 print("DEBUG: No Plot Area provided -> Using Full Image with Heuristics")
+                 self.debug.trace("%s: no plot area provided -> using full image with heuristics", label)
                  # Heuristic: Mask out likely axis areas (outer 5%) unless strong signal
                  h, w = combined_mask.shape
                  margin_x = int(w * 0.05)
@@ -664,26 +852,21 @@ class AutoDetector:
                  central_mask = np.zeros_like(combined_mask)
                  central_mask[margin_y:h-margin_y, margin_x:w-margin_x] = 255
                  combined_mask = cv2.bitwise_and(combined_mask, central_mask)
-                 print("DEBUG: Applied Central 90% Mask")
 
             # Morphological Clean-up (Remove Text/Noise)
             # Text is usually small detached blobs. Lines are long.
             # 1. Open to remove small noise
             kernel_open = np.ones((2,2), np.uint8) 
-            combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel_open)
-            
-            # 2. Close to bridge small gaps in lines
             kernel_close = np.ones((3,3), np.uint8)
-            combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel_close)
+            with stage('morphology'):
+                combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel_open)
+                # 2. Close to bridge small gaps in lines
+                combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel_close)
             
             # --- V7 LOGIC: Structural Separation (Solid vs Dashed) ---
-            print("DEBUG: Executing V7 Structural Separation")
-            
             # 1. Find Contours (Components)
-            contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # DEBUG VISUALIZATION
-            debug_img = cv2.cvtColor(combined_mask, cv2.COLOR_GRAY2BGR)
+            with stage('contours'):
+                contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
             solid_segments = []
             dash_candidates = []
@@ -708,20 +891,15 @@ class AutoDetector:
 
                 if length > min_solid_length or w > min_solid_length or h > min_solid_length:
                     solid_segments.append(cnt)
-                    # Draw Green for Solid
-                    cv2.drawContours(debug_img, [cnt], -1, (0, 255, 0), 2)
                 else:
                     dash_candidates.append(cnt)
-                    # Draw Red for Dashed
-                    cv2.drawContours(debug_img, [cnt], -1, (0, 0, 255), -1)
             
-            # Save Debug Image to Desktop
-            import time
-            import os
-            desktop = os.path.expanduser("~/Desktop")
-            debug_path = os.path.join(desktop, f"debug_v7_components_{int(time.time())}.png")
-            cv2.imwrite(debug_path, debug_img)
-            print(f"DEBUG: Saved V7 debug image to {debug_path}")
+            if self.debug.enabled:
+                # Component classification overlay: green = solid, red = dashed
+                debug_img = cv2.cvtColor(combined_mask, cv2.COLOR_GRAY2BGR)
+                cv2.drawContours(debug_img, solid_segments, -1, (0, 255, 0), 2)
+                cv2.drawContours(debug_img, dash_candidates, -1, (0, 0, 255), -1)
+                self.debug.save_image('v7_components', debug_img)
             
             final_list = []
             
@@ -771,7 +949,7 @@ class AutoDetector:
             # No, if solid_segments found, we are good.
             
             if not final_list:
-                print("DEBUG: V7 found nothing, falling back to basic clustering")
+                self.debug.trace("%s: V7 found nothing, falling back to basic clustering", label)
                 # Fallback to simple clustering
                 series_list = self._detect_series_by_clustering(combined_mask)
                 for s in series_list:
@@ -779,51 +957,45 @@ class AutoDetector:
                     s['color'] = [int(c) for c in target_color]
                     final_list.append(s)
 
-            # Add Debug ROI helper
+            # Add Debug ROI helper, offset cropped coordinates back to the full image
             for series in final_list:
                 if roi_rect: series['debug_roi'] = roi_rect
+                if x0 or y0 or isinstance(series['points'], np.ndarray):
+                    series['points'] = (np.asarray(series['points']).reshape(-1, 2) + (x0, y0)).tolist()
 
-            print(f"DEBUG: V7 Result: {len(final_list)} series found.")
+            self.debug.trace("%s: V7 result: %d series found", label, len(final_list))
             return final_list
             
         except Exception as e:
-            print(f"Error in _extract_series_by_color: {e}")
-            import traceback
-            traceback.print_exc()
+            self.debug.logger.exception(f"Error in _extract_series_by_color: {e}")
             return []
 
-    def _extract_points_from_mask(self, mask: np.ndarray) -> List[Tuple[int, int]]:
-        """Extract all non-zero points from a mask (V7 Helper)"""
-        y_indices, x_indices = np.nonzero(mask)
-        points = []
+    @timed('point_extraction')
+    def _extract_points_from_mask(self, mask: np.ndarray) -> np.ndarray:
+        """Extract all non-zero points of a mask as an (N, 2) array of (x, y), sorted by x (V7 Helper)"""
+        points = cv2.findNonZero(mask) # (N, 1, 2) in row-major order, None when empty
+        if points is None:
+            return np.empty((0, 2), dtype=np.int64)
+        points = points.reshape(-1, 2).astype(np.int64)
         # Downsample for performance if needed
-        step = 1
-        if len(x_indices) > 5000: step = 2
+        if len(points) > 5000:
+            points = points[::2]
         
-        for i in range(0, len(x_indices), step):
-            points.append((int(x_indices[i]), int(y_indices[i])))
-        
-        # Sort by X
-        points.sort(key=lambda p: p[0])
-        return points
+        # Sort by X (stable: row order kept within a column)
+        return points[np.argsort(points[:, 0], kind='stable')]
     
-    def _detect_line_style(self, points: List[Tuple[int, int]]) -> str:
+    def _detect_line_style(self, points: np.ndarray) -> str:
         """
-        Detect if line is solid or dashed based on point distribution
+        Detect if line is solid or dashed based on point distribution of (N, 2) points
         """
         if len(points) < 10:
             return 'solid'
         
         # Calculate gaps between consecutive points
-        gaps = []
-        for i in range(len(points) - 1):
-            x1, y1 = points[i]
-            x2, y2 = points[i + 1]
-            dist = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            gaps.append(dist)
+        steps = np.diff(np.asarray(points, dtype=np.float64).reshape(-1, 2), axis=0)
+        gaps = np.hypot(steps[:, 0], steps[:, 1])
         
         # If there are regular large gaps, it's dashed
-        gaps = np.array(gaps)
         large_gaps = gaps[gaps > 10]
         
         if len(large_gaps) > len(gaps) * 0.3:  # More than 30% large gaps
@@ -841,14 +1013,14 @@ class AutoDetector:
         Validate if detected series is a real data curve
         Returns False for noise/scattered points
         """
-        points = series_data['points']
+        points = np.asarray(series_data['points']).reshape(-1, 2)
         
         if len(points) < 50:
             return False
         
         # Check horizontal span (should cover reasonable x-range)
-        x_coords = [p[0] for p in points]
-        x_span = max(x_coords) - min(x_coords)
+        x_coords = np.sort(points[:, 0])
+        x_span = x_coords[-1] - x_coords[0]
         min_span = self.width * 0.3  # Should cover at least 30% of image width
         
         if x_span < min_span:
@@ -856,16 +1028,12 @@ class AutoDetector:
         
         # Check point density - avoid sparse scattered points
         # Calculate average gap between consecutive x-coordinates
-        sorted_points = sorted(points, key=lambda p: p[0])
-        x_gaps = []
-        for i in range(len(sorted_points) - 1):
-            gap = sorted_points[i+1][0] - sorted_points[i][0]
-            if gap > 0:  # Skip duplicates
-                x_gaps.append(gap)
-        
-        if x_gaps:
-            avg_gap = sum(x_gaps) / len(x_gaps)
-            max_gap = max(x_gaps)
+        x_gaps = np.diff(x_coords)
+        x_gaps = x_gaps[x_gaps > 0]  # Skip duplicates
+        
+        if len(x_gaps):
+            avg_gap = x_gaps.mean()
+            max_gap = x_gaps.max()
             
             # If there are very large gaps, it might be scattered noise
             # Max gap shouldn't be more than 10x the average
@@ -911,17 +1079,13 @@ class AutoDetector:
             # Only process elongated shapes (lines)
             if aspect_ratio > 2:
                 # Analyze gaps in this contour
-                sorted_pts = sorted(points, key=lambda p: p[0])
+                sorted_pts = points[np.argsort(points[:, 0], kind='stable')]
                 
                 # Calculate pixel-to-pixel distances
-                gaps = []
-                for i in range(len(sorted_pts) - 1):
-                    dx = sorted_pts[i+1][0] - sorted_pts[i][0]
-                    dy = sorted_pts[i+1][1] - sorted_pts[i][1]
-                    dist = np.sqrt(dx**2 + dy**2)
-                    gaps.append(dist)
+                steps = np.diff(sorted_pts, axis=0).astype(np.float64)
+                gaps = np.hypot(steps[:, 0], steps[:, 1])
                 
-                if not gaps:
+                if len(gaps) == 0:
                     continue
                 
                 avg_gap = np.mean(gaps)
@@ -933,27 +1097,24 @@ class AutoDetector:
                 has_breaks = max_gap > 5
                 
                 if has_breaks:  # Only include non-solid lines
-                    for pt in points:
-                        valid_points.append((int(pt[0]), int(pt[1])))
+                    valid_points.append(points)
         
-        if len(valid_points) < 30:
+        if sum(len(p) for p in valid_points) < 30:
             return None
         
-        # Remove duplicates and sort
-        valid_points = sorted(set(valid_points), key=lambda p: p[0])
+        # Remove duplicates and sort (by x, then y)
+        valid_points = np.unique(np.concatenate(valid_points), axis=0)
         
         # Sample if too many
         if len(valid_points) > 200:
-            step = len(valid_points) // 200
-            # Fix list slicing type error
-            valid_points = [valid_points[i] for i in range(0, len(valid_points), step)]
+            valid_points = valid_points[::len(valid_points) // 200]
         
         style = self._detect_line_style(valid_points)
         
         return {
             'label': label,
             'color': sample_color,
-            'points': valid_points,
+            'points': valid_points.tolist(),
             'style': style,
             'count': len(valid_points)
         }
@@ -1016,21 +1177,20 @@ class AutoDetector:
                 continue
             
             # Extract points
-            points_array = contour.reshape(-1, 2)
-            points = [(int(pt[0]), int(pt[1])) for pt in points_array]
+            points = contour.reshape(-1, 2)
             
             # Check if this contour's pattern matches expected
             contour_pattern = self._detect_line_style(points)
             
             # Accept if pattern matches OR if it's solid (baseline)
             if contour_pattern == expected_pattern or expected_pattern == 'solid':
-                all_points.extend(points)
+                all_points.append(points)
         
-        if len(all_points) < 30:
+        if sum(len(p) for p in all_points) < 30:
             return None
         
-        # Remove duplicates and sort
-        all_points = sorted(set(all_points), key=lambda p: p[0])
+        # Remove duplicates and sort (by x, then y)
+        all_points = np.unique(np.concatenate(all_points), axis=0)
         
         # CRITICAL: Filter points to only include those inside plot area
         all_points = self._filter_points_in_plot_area(all_points, plot_area)
@@ -1040,14 +1200,12 @@ class AutoDetector:
         
         # Sample if too many
         if len(all_points) > 200:
-            step = len(all_points) // 200
-            # Fix list slicing type error
-            all_points = [all_points[i] for i in range(0, len(all_points), step)]
+            all_points = all_points[::len(all_points) // 200]
         
         return {
             'label': label,
             'color': actual_color,
-            'points': all_points,
+            'points': all_points.tolist(),
             'style': expected_pattern,
             'count': len(all_points)
         }
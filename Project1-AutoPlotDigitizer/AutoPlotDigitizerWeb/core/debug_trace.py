@@ -0,0 +1,66 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import cv2
+import numpy as np
+
+class DebugTrace:
+    """
+    Opt-in debug/tracing mode for the detection pipeline, off unless a directory is given.
+    Disabled, trace() and save_image() return immediately, and callers guard extra
+    diagnostics (mask counts, overlay images) with `if debug.enabled`.
+    Enabled, trace messages are logged at DEBUG level and artifact images are written
+    to the directory by a single background thread, so requests never wait on disk I/O.
+    """
+
+    def __init__(self, directory: Optional[str] = None, logger: Optional[logging.Logger] = None):
+        self.directory = directory or None
+        self.logger = logger or logging.getLogger(__name__)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def trace(self, message: str, *args) -> None:
+        """Logs a %-style message (formatted lazily) when tracing is enabled"""
+        if self.directory is not None:
+            self.logger.debug(message, *args)
+
+    def save_image(self, name: str, image: np.ndarray) -> Optional[str]:
+        """
+        Queues image to be written as <directory>/<name>_<timestamp>_<n>.png and returns that path
+        (None when disabled). The caller hands the array over and must not modify it afterwards.
+        """
+        if self.directory is None:
+            return None
+        path = os.path.join(self.directory, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{next(self._counter):04d}.png")
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='debug-trace')
+            self._executor.submit(self._write, path, image)
+        self.trace("Queued debug image %s", path)
+        return path
+
+    def flush(self) -> None:
+        """Blocks until every queued image has been written"""
+        with self._lock:
+            executor = self._executor
+        if executor is not None:
+            executor.submit(lambda: None).result()
+
+    def _write(self, path: str, image: np.ndarray) -> None:
+        try:
+            if not cv2.imwrite(path, image):
+                self.logger.warning(f"Could not write debug image {path}")
+        except Exception as e:
+            self.logger.warning(f"Could not write debug image {path}: {e}")
@@ -0,0 +1,51 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .auto_detector import AutoDetector
+from .debug_trace import DebugTrace
+
+class DetectorCache:
+    """
+    Thread-safe LRU cache of AutoDetector instances keyed by image content hash.
+    A cached detector keeps its decoded image and derived planes (gray, HSV,
+    Canny edges, detected axes), so repeated detections on the same upload
+    skip the preprocessing. Identical uploads from different sessions share one detector.
+    """
+
+    def __init__(self, max_entries: int = 8, debug: Optional[DebugTrace] = None):
+        self.max_entries = max_entries
+        self.debug = debug # Passed to every detector created
+        self._detectors: OrderedDict = OrderedDict()  # content hash -> AutoDetector, oldest first
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_hash(image_path: str) -> str:
+        sha = hashlib.sha1()
+        with open(image_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def get(self, image_path: str, content_hash: Optional[str] = None) -> AutoDetector:
+        """Returns the detector for the image, creating it on a miss"""
+        key = content_hash or self.content_hash(image_path)
+        with self._lock:
+            detector = self._detectors.get(key)
+            if detector is not None:
+                self._detectors.move_to_end(key)
+                return detector
+
+        # Decode outside the lock so other images are not blocked meanwhile
+        detector = AutoDetector(image_path, debug=self.debug)
+        with self._lock:
+            detector = self._detectors.setdefault(key, detector)
+            self._detectors.move_to_end(key)
+            while len(self._detectors) > self.max_entries:
+                self._detectors.popitem(last=False)
+        return detector
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._detectors)
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+class SessionStore:
+    """
+    Thread-safe in-memory store of per-browser-session state dicts.
+    Sessions idle for longer than ttl_seconds are dropped, and the least recently
+    used ones are evicted when more than max_sessions exist.
+    on_evict(session_id, data, reason) is called (outside the lock) for every dropped
+    session, reason being 'expired' (idle past the TTL), 'evicted' (least recently used,
+    over max_sessions) or 'removed' (explicit remove).
+    """
+
+    def __init__(self, max_sessions: int = 100, ttl_seconds: float = 2 * 3600,
+                 on_evict: Optional[Callable[[str, dict, str], None]] = None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._sessions: OrderedDict = OrderedDict()  # session_id -> (last_access, data), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> dict:
+        """Returns the state dict of a session, creating it if needed, and marks it as used"""
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._expire(now)
+            entry = self._sessions.pop(session_id, None)
+            data = entry[1] if entry else {}
+            self._sessions[session_id] = (now, data)
+            while len(self._sessions) > self.max_sessions:
+                sid, (_, old) = self._sessions.popitem(last=False)
+                evicted.append((sid, old, 'evicted'))
+        self._notify(evicted)
+        return data
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        if entry:
+            self._notify([(session_id, entry[1], 'removed')])
+
+    def purge_expired(self) -> int:
+        """Drops expired sessions now; returns how many were removed"""
+        with self._lock:
+            evicted = self._expire(time.monotonic())
+        self._notify(evicted)
+        return len(evicted)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _expire(self, now: float) -> list:
+        # Entries are ordered by last access, so expired ones are at the front
+        evicted = []
+        while self._sessions:
+            sid, (last_access, data) = next(iter(self._sessions.items()))
+            if now - last_access <= self.ttl_seconds:
+                break
+            del self._sessions[sid]
+            evicted.append((sid, data, 'expired'))
+        return evicted
+
+    def _notify(self, evicted: list) -> None:
+        if self.on_evict:
+            for sid, data, reason in evicted:
+                self.on_evict(sid, data, reason)
@@ -107,7 +107,7 @@ async function handleImageUpload(file) {
 
         if (data.success) {
             state.imageData = data;
-            loadImageToCanvas(data.image, data.width, data.height);
+            loadImageToCanvas(data.image_url, data.width, data.height);
 
             // Show sections
             document.getElementById('canvas-section').style.display = 'block';
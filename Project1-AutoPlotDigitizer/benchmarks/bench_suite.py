@@ -0,0 +1,274 @@
+"""
+Speed and accuracy benchmark of the digitizer on synthetic plots with known ground truth.
+
+Every scenario of synthetic_plots (solid, dashed, dotted, multicolor, log axes,
+perspective skew) is rendered at each size (500 px to 8K) and digitized by:
+    desktop     ImageProcessor.process_images, one extraction per curve color (as in the GUI)
+    web_color   AutoDetector guided mode, detection_method='color'
+    web_style   AutoDetector guided mode, detection_method='style'
+    web_auto    AutoDetector full-auto mode (axis detection + clustering)
+Each run starts from the PNG file (decoding included) and ends with data values.
+Reported: wall time (best of --repeat), peak traced memory (Python + NumPy buffers,
+measured in a separate run), seconds per pipeline stage, and the RMS error of the
+extracted points in y axis units (data units, or decades on a log axis) plus how much
+of the x range they cover.
+
+The desktop and web apps each have a package named `core`, so each app runs in its
+own worker process. Results are written as JSON for comparison between commits:
+
+    python benchmarks/bench_suite.py --output before.json
+    python benchmarks/bench_suite.py --output after.json --compare before.json
+    python benchmarks/bench_suite.py --sizes 500 1k --scenarios solid dashed --targets desktop
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from synthetic_plots import SCENARIOS, SIZES, render
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP_DIRS = {
+    'desktop': os.path.join(ROOT, 'AutoPlotDigitizerV1_Windows_Port'),
+    'web': os.path.join(ROOT, 'AutoPlotDigitizerWeb'),
+}
+TARGETS = {
+    'desktop': 'desktop',
+    'web_color': 'web',
+    'web_style': 'web',
+    'web_auto': 'web',
+}
+
+# --- Worker side (runs inside one app's directory) ---
+
+def desktop_runner():
+    from core.calibration import Calibrator
+    from core.processor import ImageProcessor
+
+    def run(plot, path, target):
+        image = cv2.imread(path)
+        mask = plot.roi_mask()
+        calibrator = plot.calibrator(Calibrator)
+        processor = ImageProcessor()
+        extracted = []
+        for name, color in plot.curves:
+            target_hsv = cv2.cvtColor(np.uint8([[color]]), cv2.COLOR_BGR2HSV)[0, 0].tolist()
+            points_px, _ = processor.process_images(image, mask, hsv_range=ImageProcessor.hsv_range_from_target(target_hsv))
+            extracted.append((name, calibrator.map_to_data_many(points_px)))
+        return extracted
+    return run
+
+def web_runner():
+    from core.auto_detector import AutoDetector
+    from core.calibration import Calibrator
+
+    def run(plot, path, target):
+        detector = AutoDetector(path)
+        calibrator = plot.calibrator(Calibrator)
+        if target == 'web_auto':
+            series = detector.detect_auto(mode='auto', n_series=len(plot.curves))
+            # No color to tell curves apart: every point is scored against its nearest curve
+            return [(None, calibrator.map_to_data_many(s['points'])) for s in series if s['points']]
+
+        method = 'color' if target == 'web_color' else 'style'
+        series = detector.detect_auto(mode='guided', colors=[list(color) for _, color in plot.curves],
+                                      detection_method=method,
+                                      calibration_points={'points': [list(p) for p in plot.calibration['pixel_points']]})
+        extracted = []
+        for s in series:
+            if not s or not s['points']:
+                continue
+            index = int(s['label'].split()[1]) - 1 # "Graph N" or "Graph N (Solid)"
+            extracted.append((plot.curves[index][0], calibrator.map_to_data_many(s['points'])))
+        return extracted
+    return run
+
+def score_extraction(plot, extracted):
+    """Per-curve scores, plus the point-weighted RMS and mean coverage over all curves"""
+    if extracted and extracted[0][0] is None:
+        points = np.concatenate([pts for _, pts in extracted])
+        curves = {'nearest': plot.score(points)}
+    else:
+        curves = {}
+        for name, _ in plot.curves:
+            parts = [pts for curve, pts in extracted if curve == name]
+            curves[name] = plot.score(np.concatenate(parts) if parts else np.empty((0, 2)), name)
+
+    scored = [c for c in curves.values() if c['points']]
+    total_points = sum(c['points'] for c in scored)
+    rms = float(np.sqrt(sum(c['points'] * c['rms'] ** 2 for c in scored) / total_points)) if total_points else None
+    coverage = float(np.mean([c['coverage'] for c in curves.values()])) if curves else 0.0
+    return {'rms': rms, 'coverage': coverage, 'points': total_points, 'curves': curves}
+
+def measure(run, repeat, track_memory, stage_timer_cls):
+    """Best wall time of `repeat` runs (the first one records stage timings) and peak traced memory"""
+    best, stages, result = None, None, None
+    for i in range(repeat):
+        timer = stage_timer_cls()
+        start = time.perf_counter()
+        with timer.activate():
+            result = run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best, stages = elapsed, timer.stages
+
+    peak_mb = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = peak / (1024 * 1024)
+    return result, best, stages, peak_mb
+
+def run_worker(app, args):
+    sys.path.insert(0, APP_DIRS[app])
+    from core.stage_timer import StageTimer
+    run = desktop_runner() if app == 'desktop' else web_runner()
+    targets = [t for t in args.targets if TARGETS[t] == app]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenario in args.scenarios:
+            for size in args.sizes:
+                plot = render(scenario, size)
+                path = os.path.join(tmp, f"{scenario}_{size}.png")
+                cv2.imwrite(path, plot.image)
+                height, width = plot.image.shape[:2]
+                for target in targets:
+                    entry = {'scenario': scenario, 'size': size, 'width': width, 'height': height, 'target': target}
+                    try:
+                        extracted, seconds, stages, peak_mb = measure(lambda: run(plot, path, target), args.repeat,
+                                                                      not args.no_memory, StageTimer)
+                        entry.update(seconds=seconds, peak_mb=peak_mb, stages=stages, error=None)
+                        entry.update(score_extraction(plot, extracted))
+                    except Exception as e:
+                        entry.update(seconds=None, peak_mb=None, stages={}, error=f"{type(e).__name__}: {e}",
+                                     rms=None, coverage=0.0, points=0, curves={})
+                    results.append(entry)
+                    print(f"{scenario:12s} {size:4s} {target:10s} done", file=sys.stderr, flush=True)
+
+    with open(args.worker_output, 'w') as f:
+        json.dump(results, f)
+
+# --- Driver side ---
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_app(app, args):
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        output = f.name
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', app, '--worker-output', output,
+           '--repeat', str(args.repeat), '--sizes', *args.sizes, '--scenarios', *args.scenarios,
+           '--targets', *args.targets]
+    if args.no_memory:
+        cmd.append('--no-memory')
+    # Worker stdout carries the apps' own debug prints; progress goes to stderr
+    proc = subprocess.run(cmd, cwd=APP_DIRS[app], stdout=subprocess.DEVNULL)
+    try:
+        if proc.returncode != 0:
+            raise RuntimeError(f"{app} worker failed with exit code {proc.returncode}")
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+def result_key(entry):
+    return (entry['scenario'], entry['size'], entry['target'])
+
+def format_ms(seconds):
+    return f"{seconds * 1000:10.1f}" if seconds is not None else f"{'-':>10s}"
+
+def print_report(results, baseline=None):
+    base = {result_key(e): e for e in baseline['results']} if baseline else {}
+    header = f"{'scenario':12s} {'size':4s} {'target':10s} {'time ms':>10s} {'peak MB':>8s} {'rms':>9s} {'cover':>6s} {'points':>7s}"
+    if base:
+        header += f" {'time vs base':>12s} {'rms vs base':>12s}"
+    print(header)
+    print('-' * len(header))
+    for e in results:
+        peak = f"{e['peak_mb']:8.1f}" if e['peak_mb'] is not None else f"{'-':>8s}"
+        rms = f"{e['rms']:9.4f}" if e['rms'] is not None else f"{'-':>9s}"
+        line = f"{e['scenario']:12s} {e['size']:4s} {e['target']:10s} {format_ms(e['seconds'])} {peak} {rms} {e['coverage']:6.2f} {e['points']:7d}"
+        old = base.get(result_key(e))
+        if old:
+            if e['seconds'] and old['seconds']:
+                line += f" {(e['seconds'] / old['seconds'] - 1) * 100:+11.1f}%"
+            else:
+                line += f" {'-':>12s}"
+            if e['rms'] is not None and old['rms'] is not None:
+                line += f" {e['rms'] - old['rms']:+12.4f}"
+            else:
+                line += f" {'-':>12s}"
+        if e['error']:
+            line += f"  ERROR: {e['error']}"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark digitizer speed and accuracy on synthetic plots.")
+    parser.add_argument("--sizes", nargs='+', default=list(SIZES), choices=list(SIZES), help="Image sizes to render")
+    parser.add_argument("--scenarios", nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS), help="Plot scenarios")
+    parser.add_argument("--targets", nargs='+', default=list(TARGETS), choices=list(TARGETS), help="Pipelines to benchmark")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per case (the best one is reported)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the (slower) peak memory run")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file for the results")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--worker", choices=list(APP_DIRS), help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker, args)
+        return 0
+
+    start = time.perf_counter()
+    results = []
+    for app in APP_DIRS:
+        if any(TARGETS[t] == app for t in args.targets):
+            results.extend(run_app(app, args))
+    results.sort(key=lambda e: (list(SCENARIOS).index(e['scenario']), list(SIZES).index(e['size']),
+                                list(TARGETS).index(e['target'])))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'elapsed_seconds': time.perf_counter() - start,
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    print(f"\nWrote {args.output} ({len(results)} runs, {report['meta']['elapsed_seconds']:.1f}s)")
+    failed = sum(1 for e in results if e['error'])
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
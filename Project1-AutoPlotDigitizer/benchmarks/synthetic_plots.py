@@ -0,0 +1,224 @@
+"""
+Synthetic plot images with known ground truth, shared by the benchmark suite.
+
+Every plot is rendered from curves defined in data units, so the error of an
+extraction can be measured exactly: extracted pixels are mapped back to data with
+the plot's calibration and compared with the curve they should lie on.
+"""
+import cv2
+import numpy as np
+
+# Image sizes (width, height), from a small inline figure up to an 8K scan
+SIZES = {
+    '500': (500, 300),
+    '1k': (1000, 600),
+    'fhd': (1920, 1080),
+    '4k': (3840, 2160),
+    '8k': (7680, 4320),
+}
+
+# Curve colors (BGR). Pure red is avoided: full-auto detection excludes red annotations.
+BLUE = (200, 80, 20)
+GREEN = (40, 160, 40)
+ORANGE = (0, 140, 255)
+PURPLE = (160, 40, 140)
+
+X_RANGE = (0.0, 10.0)
+Y_RANGE = (0.0, 10.0)
+LOG_Y_RANGE = (1.0, 1e4)
+
+# Ground-truth curves in data units (x in X_RANGE)
+CURVES = {
+    'wave': lambda x: 5.0 + 3.0 * np.sin(0.8 * x),
+    'ramp': lambda x: 1.5 + 0.6 * x,
+    'dip': lambda x: 8.5 - 2.5 * np.exp(-((x - 5.0) / 1.8) ** 2),
+    'growth': lambda x: 10.0 ** (0.5 + 0.3 * x), # Spans ~3 .. 3000 (log y axis)
+}
+
+# name -> (curves as [(curve name, color)], line style, log y axis, perspective skew)
+SCENARIOS = {
+    'solid': ([('wave', BLUE)], 'solid', False, False),
+    'dashed': ([('wave', BLUE)], 'dashed', False, False),
+    'dotted': ([('wave', BLUE)], 'dotted', False, False),
+    'multicolor': ([('wave', BLUE), ('ramp', GREEN), ('dip', ORANGE)], 'solid', False, False),
+    'log_axes': ([('growth', PURPLE)], 'solid', True, False),
+    'perspective': ([('wave', BLUE)], 'solid', False, True),
+}
+
+class SyntheticPlot:
+    """
+    A rendered plot plus everything needed to score an extraction of it.
+    calibration: {'pixel_points', 'values'} in Calibrator order (X1, X2, Y1, Y2) for
+    axis-aligned plots, or the four plot corners when skewed ('perspective': True).
+    """
+
+    def __init__(self, image, curves, calibration, plot_quad, log_y):
+        self.image = image
+        self.curves = curves # [(curve name, BGR color)]
+        self.calibration = calibration
+        self.plot_quad = plot_quad # Plot area corners in pixels (TL, TR, BR, BL)
+        self.log_y = log_y
+
+    def calibrator(self, calibrator_cls):
+        """Configured instance of the given Calibrator class (desktop or web copy)"""
+        calibrator = calibrator_cls()
+        if self.calibration['perspective']:
+            calibrator.set_perspective_calibration(self.calibration['pixel_points'], self.calibration['values'],
+                                                   is_log_y=self.log_y)
+        else:
+            calibrator.set_calibration(self.calibration['pixel_points'], self.calibration['values'],
+                                       is_log_y=self.log_y)
+        return calibrator
+
+    def roi_mask(self, inset=0):
+        """Plot area as a filled mask, like the region a user paints in the desktop app"""
+        mask = np.zeros(self.image.shape[:2], dtype=np.uint8)
+        quad = np.asarray(self.plot_quad, dtype=np.float64)
+        if inset:
+            center = quad.mean(axis=0)
+            quad = quad + np.sign(center - quad) * inset
+        cv2.fillPoly(mask, [np.round(quad).astype(np.int32)], 255)
+        return mask
+
+    def score(self, data_points, curve_name=None):
+        """
+        Error of extracted data points against a curve (or the nearest curve when
+        curve_name is None). Residuals are in y axis units: data units on a linear
+        axis, decades on a log axis.
+        Returns {'points', 'rms', 'coverage'}; coverage is the fraction of the x range
+        (in 1% bins) that received at least one point.
+        """
+        pts = np.asarray(data_points, dtype=np.float64).reshape(-1, 2)
+        pts = pts[np.isfinite(pts).all(axis=1)]
+        pts = pts[(pts[:, 0] >= X_RANGE[0]) & (pts[:, 0] <= X_RANGE[1])]
+        if self.log_y:
+            pts = pts[pts[:, 1] > 0]
+        if len(pts) == 0:
+            return {'points': 0, 'rms': None, 'coverage': 0.0}
+
+        to_axis = np.log10 if self.log_y else (lambda v: v)
+        names = [curve_name] if curve_name else [name for name, _ in self.curves]
+        residuals = np.stack([to_axis(pts[:, 1]) - to_axis(CURVES[name](pts[:, 0])) for name in names])
+        nearest = np.abs(residuals).min(axis=0)
+
+        bins = np.floor((pts[:, 0] - X_RANGE[0]) / (X_RANGE[1] - X_RANGE[0]) * 100).clip(0, 99)
+        return {
+            'points': int(len(pts)),
+            'rms': float(np.sqrt(np.mean(nearest ** 2))),
+            'coverage': len(np.unique(bins)) / 100.0
+        }
+
+def _line_scale(width):
+    """Line thickness for an image width: 2 px at 1000 px, growing with resolution"""
+    return max(2, int(round(width / 640)))
+
+def _draw_curve(image, xs_px, ys_px, color, style, thickness):
+    pts = np.column_stack((xs_px, ys_px))
+    shift = 4 # Sub-pixel accurate polylines
+    fixed = np.round(pts * (1 << shift)).astype(np.int32)
+
+    if style == 'solid':
+        cv2.polylines(image, [fixed.reshape(-1, 1, 2)], False, color, thickness, cv2.LINE_AA, shift)
+        return
+
+    # Split the curve by arc length into dashes or dots
+    arc = np.concatenate(([0.0], np.cumsum(np.hypot(np.diff(xs_px), np.diff(ys_px)))))
+    if style == 'dashed':
+        dash, gap = 6 * thickness, 3 * thickness
+        dash_index = (arc // (dash + gap)).astype(np.int64)
+        on = arc - dash_index * (dash + gap) < dash
+        for i in np.unique(dash_index[on]):
+            seg_pts = fixed[on & (dash_index == i)]
+            if len(seg_pts) > 1:
+                cv2.polylines(image, [seg_pts.reshape(-1, 1, 2)], False, color, thickness, cv2.LINE_AA, shift)
+    else: # dotted
+        spacing = 4 * thickness
+        for s in np.arange(0, arc[-1], spacing):
+            i = int(np.searchsorted(arc, s))
+            cv2.circle(image, (int(fixed[i, 0]), int(fixed[i, 1])), max(1, thickness // 2) << shift,
+                       color, -1, cv2.LINE_AA, shift)
+
+def render(scenario, size):
+    """Renders SCENARIOS[scenario] at SIZES[size] (or an explicit (width, height))"""
+    curves, style, log_y, skew = SCENARIOS[scenario]
+    width, height = SIZES[size] if isinstance(size, str) else size
+    thickness = _line_scale(width)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    # Plot area, leaving room for tick labels
+    left, right = int(width * 0.10), int(width * 0.95)
+    top, bottom = int(height * 0.08), int(height * 0.88)
+    y_lo, y_hi = LOG_Y_RANGE if log_y else Y_RANGE
+    y_axis = (lambda v: np.log10(v)) if log_y else (lambda v: v)
+
+    def to_px(x, y):
+        px = left + (x - X_RANGE[0]) / (X_RANGE[1] - X_RANGE[0]) * (right - left)
+        py = bottom - (y_axis(y) - y_axis(y_lo)) / (y_axis(y_hi) - y_axis(y_lo)) * (bottom - top)
+        return px, py
+
+    # Axes, ticks and labels (black)
+    axis_thickness = max(1, thickness // 2)
+    cv2.line(image, (left, bottom), (right, bottom), (0, 0, 0), axis_thickness)
+    cv2.line(image, (left, bottom), (left, top), (0, 0, 0), axis_thickness)
+    font_scale = height / 900
+    tick = max(4, height // 100)
+    for i in range(6):
+        x_val = X_RANGE[0] + i * (X_RANGE[1] - X_RANGE[0]) / 5
+        px, _ = to_px(x_val, y_lo)
+        cv2.line(image, (int(px), bottom), (int(px), bottom + tick), (0, 0, 0), axis_thickness)
+        cv2.putText(image, f"{x_val:g}", (int(px) - tick, bottom + 4 * tick), cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale, (0, 0, 0), axis_thickness, cv2.LINE_AA)
+    y_ticks = [10.0 ** e for e in range(int(np.log10(y_lo)), int(np.log10(y_hi)) + 1)] if log_y else \
+              [y_lo + i * (y_hi - y_lo) / 5 for i in range(6)]
+    for y_val in y_ticks:
+        _, py = to_px(X_RANGE[0], y_val)
+        cv2.line(image, (left - tick, int(py)), (left, int(py)), (0, 0, 0), axis_thickness)
+        cv2.putText(image, f"{y_val:g}", (int(width * 0.01), int(py) + tick), cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale, (0, 0, 0), axis_thickness, cv2.LINE_AA)
+
+    # Curves, sampled at (at least) one point per pixel column
+    xs = np.linspace(X_RANGE[0], X_RANGE[1], 2 * (right - left))
+    for name, color in curves:
+        xs_px, ys_px = to_px(xs, CURVES[name](xs))
+        _draw_curve(image, xs_px, ys_px, color, style, thickness)
+
+    # Calibration in Calibrator order: X1, X2 on the x axis; Y1, Y2 on the y axis
+    x1_px, _ = to_px(X_RANGE[0], y_lo)
+    x2_px, _ = to_px(X_RANGE[1], y_lo)
+    _, y1_px = to_px(X_RANGE[0], y_lo)
+    _, y2_px = to_px(X_RANGE[0], y_hi)
+    pixel_points = [(x1_px, bottom), (x2_px, bottom), (left, y1_px), (left, y2_px)]
+    values = [(X_RANGE[0], y_lo), (X_RANGE[1], y_lo), (X_RANGE[0], y_lo), (X_RANGE[0], y_hi)]
+    plot_quad = [(left, top), (right, top), (right, bottom), (left, bottom)]
+
+    if skew:
+        # Photo of a page taken slightly from below: the top edge is narrower
+        src = np.float32([(0, 0), (width, 0), (width, height), (0, height)])
+        inset = width * 0.06
+        dst = np.float32([(inset, height * 0.03), (width - inset, 0), (width, height), (0, height * 0.98)])
+        homography = cv2.getPerspectiveTransform(src, dst)
+        image = cv2.warpPerspective(image, homography, (width, height), flags=cv2.INTER_LINEAR,
+                                    borderValue=(255, 255, 255))
+        plot_quad = [tuple(p) for p in cv2.perspectiveTransform(np.float32([plot_quad]), homography)[0].tolist()]
+        # Corners map to the data range's corners (perspective calibration)
+        pixel_points = plot_quad
+        values = [(X_RANGE[0], y_hi), (X_RANGE[1], y_hi), (X_RANGE[1], y_lo), (X_RANGE[0], y_lo)]
+
+    calibration = {
+        'perspective': skew,
+        'pixel_points': [(float(x), float(y)) for x, y in pixel_points],
+        'values': values
+    }
+    return SyntheticPlot(image, curves, calibration, plot_quad, log_y)
+
+if __name__ == "__main__":
+    # Writes one PNG per scenario (1k size) for a visual check
+    import os
+    import sys
+    import tempfile
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(tempfile.gettempdir(), 'autoplot_synthetic')
+    os.makedirs(out_dir, exist_ok=True)
+    for name in SCENARIOS:
+        path = os.path.join(out_dir, f"{name}.png")
+        cv2.imwrite(path, render(name, '1k').image)
+        print(f"Wrote {path}")